@@ -0,0 +1,70 @@
+"""
+Per-trade cost of the price-alert book with millions of alerts loaded.
+
+Loads ALERTS random above/below alerts over SYMBOLS symbols with AlertBook.load,
+then replays TRADES random-walk prices through AlertBook.check and reports the
+load time, microseconds per check and how many alerts fired. A linear scan over
+one symbol's alerts is timed for comparison.
+
+    python -m benchmarks.alert_bench
+"""
+import random
+import time
+
+from bson import ObjectId
+
+from bot.cogs.watchlist.alerts import ABOVE, BELOW, Alert, AlertBook
+
+ALERTS = 2_000_000
+SYMBOLS = 1_000
+TRADES = 200_000
+
+
+def make_alerts(rng: random.Random) -> list[Alert]:
+    alerts = []
+    for i in range(ALERTS):
+        key = ("stock", f"SYM{rng.randrange(SYMBOLS)}")
+        direction = ABOVE if i % 2 else BELOW
+        # Thresholds sit 1-20% away from the 100.0 start on the side they wait for
+        offset = rng.uniform(0.01, 0.2)
+        price = round(100 * (1 + offset if direction == ABOVE else 1 - offset), 2)
+        alerts.append(Alert(ObjectId(), i, key, direction, price))
+    return alerts
+
+
+def main():
+    rng = random.Random(11)
+    alerts = make_alerts(rng)
+
+    book = AlertBook()
+    started = time.perf_counter()
+    book.load(alerts)
+    load_s = time.perf_counter() - started
+    print(f"loaded {len(book):,} alerts on {len(book.books):,} symbols in {load_s:.2f}s")
+
+    prices = {f"SYM{i}": 100.0 for i in range(SYMBOLS)}
+    trades = []
+    for _ in range(TRADES):
+        symbol = f"SYM{rng.randrange(SYMBOLS)}"
+        prices[symbol] *= 1 + rng.gauss(0, 0.002)
+        trades.append((("stock", symbol), prices[symbol]))
+
+    fired = 0
+    started = time.perf_counter()
+    for key, price in trades:
+        fired += len(book.check(key, price))
+    elapsed = time.perf_counter() - started
+    print(f"{TRADES:,} trades: {elapsed / TRADES * 1e6:.2f} µs per check, {fired:,} alerts fired, {len(book):,} left")
+
+    key = ("stock", "SYM0")
+    candidates = [alert for alert in alerts if alert.key == key]
+    started = time.perf_counter()
+    for _ in range(1000):
+        [alert for alert in candidates
+         if (alert.direction == ABOVE and 100.0 >= alert.price) or (alert.direction == BELOW and 100.0 <= alert.price)]
+    scan = (time.perf_counter() - started) / 1000
+    print(f"linear scan of one symbol's {len(candidates):,} alerts: {scan * 1e6:.2f} µs per check")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Throughput and memory of the OHLCV bar aggregator.
+
+Feeds TRADES synthetic trades (random walk, increasing timestamps at roughly
+TRADES_PER_SECOND) across SYMBOLS symbols through BarAggregator.add_trade and
+reports trades per second, then the preallocated ring bytes per symbol and the
+tracemalloc size of a populated aggregator divided by its symbols.
+
+    python -m benchmarks.bars_bench
+"""
+import random
+import time
+import tracemalloc
+
+from bot.core.bars import BarAggregator
+
+TRADES = 1_000_000
+SYMBOLS = 500
+TRADES_PER_SECOND = 2_000
+
+
+def make_trades() -> list[tuple[str, float, float, int]]:
+    rng = random.Random(7)
+    symbols = [f"SYM{i}" for i in range(SYMBOLS)]
+    prices = {symbol: 100.0 for symbol in symbols}
+    start_ms = int(time.time() * 1000)
+    trades = []
+    for i in range(TRADES):
+        symbol = symbols[rng.randrange(SYMBOLS)]
+        prices[symbol] *= 1 + rng.gauss(0, 0.0005)
+        trades.append((symbol, prices[symbol], float(rng.randint(1, 500)), start_ms + i * 1000 // TRADES_PER_SECOND))
+    return trades
+
+
+def main():
+    trades = make_trades()
+    aggregator = BarAggregator()
+    add_trade = aggregator.add_trade
+
+    started = time.perf_counter()
+    for symbol, price, volume, timestamp in trades:
+        add_trade(symbol, price, volume, timestamp)
+    elapsed = time.perf_counter() - started
+
+    span_s = TRADES / TRADES_PER_SECOND
+    print(f"{TRADES:,} trades over {SYMBOLS} symbols ({span_s / 60:.0f} min of market time)")
+    print(f"throughput: {TRADES / elapsed:,.0f} trades/s")
+    print(f"ring buffers: {aggregator.bytes_per_symbol:,} bytes per symbol")
+    print(f"sample: {aggregator.day_stats('SYM0')}")
+
+    tracemalloc.start()
+    populated = BarAggregator()
+    for symbol, price, volume, timestamp in trades[:SYMBOLS * 20]:
+        populated.add_trade(symbol, price, volume, timestamp)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"tracemalloc: {current / len(populated):,.0f} bytes per symbol including objects")
+
+
+if __name__ == "__main__":
+    main()
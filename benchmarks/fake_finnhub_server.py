@@ -0,0 +1,96 @@
+"""
+Local stand-in for the Finnhub trade websocket, for exercising shards offline.
+
+Tracks subscribe/unsubscribe frames per connection and pushes one trade frame per
+subscribed symbol every ``tick`` seconds, shaped like Finnhub's
+``{"type": "trade", "data": [{"s", "p", "t", "v"}]}``.
+
+    python -m benchmarks.fake_finnhub_server --port 8765
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import websockets
+
+
+class FakeFinnhubServer:
+    def __init__(self, host: str = "localhost", port: int = 8765, tick: float = 0.05):
+        self.host = host
+        self.port = port
+        self.tick = tick
+        self.connections: dict = {}  # websocket -> symbols it subscribed to
+        self.subscribes = 0
+        self.unsubscribes = 0
+        self.frames_sent = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await websockets.serve(self.handler, self.host, self.port)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def drop_all(self):
+        """Close every client connection, to exercise reconnect and subscription replay."""
+
+        for websocket in list(self.connections):
+            await websocket.close()
+
+    async def handler(self, websocket):
+        symbols: set[str] = set()
+        self.connections[websocket] = symbols
+        pusher = asyncio.create_task(self.push_trades(websocket, symbols))
+        try:
+            async for message in websocket:
+                frame = json.loads(message)
+                if frame.get("type") == "subscribe":
+                    symbols.add(frame["symbol"])
+                    self.subscribes += 1
+                elif frame.get("type") == "unsubscribe":
+                    symbols.discard(frame["symbol"])
+                    self.unsubscribes += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            pusher.cancel()
+            self.connections.pop(websocket, None)
+
+    async def push_trades(self, websocket, symbols: set[str]):
+        while True:
+            await asyncio.sleep(self.tick)
+            if not symbols:
+                continue
+            now = int(time.time() * 1000)
+            for symbol in list(symbols):
+                trade = {"s": symbol, "p": round(random.uniform(10, 500), 2), "t": now, "v": random.randint(1, 500)}
+                await websocket.send(json.dumps({"type": "trade", "data": [trade]}))
+                self.frames_sent += 1
+
+    def subscribed(self) -> list[set[str]]:
+        return list(self.connections.values())
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = FakeFinnhubServer(args.host, args.port, args.tick)
+    await server.start()
+    print(f"Fake Finnhub listening on {server.url}")
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
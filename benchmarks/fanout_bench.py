@@ -0,0 +1,65 @@
+"""
+Watchlist fan-out benchmark against stub providers with fixed latency.
+
+Every stub sleeps BASE_LATENCY except one symbol per run that sleeps SLOW_LATENCY.
+A sequential walk (the old select_callback loop) grows with the number of symbols,
+MarketData.fetch_quotes should stay close to SLOW_LATENCY regardless of size.
+
+    python -m benchmarks.fanout_bench
+"""
+import asyncio
+import time
+
+from bot.core.constant import TradeType, type_list
+from bot.core.market_data import MarketData, normalize_symbol
+
+BASE_LATENCY = 0.05
+SLOW_LATENCY = 0.25
+SIZES = [1, 10, 40, 100]
+
+
+def make_stub(trade_type: str):
+    async def provider(symbol: str) -> dict:
+        await asyncio.sleep(SLOW_LATENCY if "SLOW" in symbol.upper() else BASE_LATENCY)
+        return {"symbol": symbol, "current_price": 1.0, "percent_change": 0.0, "type": trade_type}
+
+    return provider
+
+
+def make_watchlist(size: int) -> list[dict]:
+    entries = [{"symbol": f"SYM{i}", "type": type_list[i % len(type_list)]} for i in range(size)]
+    entries[-1]["symbol"] = "SLOW"
+    return entries
+
+
+async def run_sequential(market_data: MarketData, entries: list[dict]) -> float:
+    start = time.perf_counter()
+    for entry in entries:
+        await market_data.fetch_quote(entry["type"], entry["symbol"])
+    return time.perf_counter() - start
+
+
+async def run_fanout(market_data: MarketData, entries: list[dict]) -> float:
+    start = time.perf_counter()
+    quotes = await market_data.fetch_quotes(entries)
+    elapsed = time.perf_counter() - start
+    expected = [normalize_symbol(e["type"], e["symbol"]) for e in entries]
+    assert [q["symbol"] for q in quotes] == expected, "fan-out must keep watchlist order"
+    return elapsed
+
+
+async def main():
+    providers = {trade_type.value: make_stub(trade_type.value) for trade_type in TradeType}
+    # No cache, and limits high enough that no provider queues, so the fan-out is bounded only by the slowest call
+    market_data = MarketData(providers=providers, limits={t: 100 for t in providers})
+
+    print(f"{'symbols':>8} {'sequential':>12} {'fan-out':>10}")
+    for size in SIZES:
+        entries = make_watchlist(size)
+        sequential = await run_sequential(market_data, entries)
+        fanout = await run_fanout(market_data, entries)
+        print(f"{size:>8} {sequential:>11.3f}s {fanout:>9.3f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Cost of the vectorized indicator snapshot at 1k and 100k bars.
+
+Builds a synthetic random-walk OHLCV series of each size, checks the blockwise
+EMA against a plain recursive loop, then times compute_indicators (RSI, EMA
+crossover, ATR, support/resistance) and the same RSI + ATR + EMAs written as
+Python loops, reporting milliseconds per snapshot and the speed-up.
+
+    python -m benchmarks.indicator_bench
+"""
+import time
+
+import numpy as np
+
+from bot.core.indicators import compute_indicators, ema
+
+SIZES = (1_000, 100_000)
+REPEATS = 20
+
+
+def make_candles(size: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size)))
+    spread = close * rng.uniform(0.001, 0.02, size)
+    return {
+        "time": np.arange(size, dtype=np.int64) * 86_400,
+        "open": np.roll(close, 1),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.uniform(1_000, 100_000, size),
+    }
+
+
+def loop_ema(values, alpha: float) -> list[float]:
+    out = [values[0]]
+    for value in values[1:]:
+        out.append(alpha * value + (1 - alpha) * out[-1])
+    return out
+
+
+def loop_indicators(candles: dict) -> tuple[float, ...]:
+    close = candles["close"].tolist()
+    high = candles["high"].tolist()
+    low = candles["low"].tolist()
+    gains, losses, ranges = [], [], []
+    for i in range(1, len(close)):
+        delta = close[i] - close[i - 1]
+        gains.append(max(delta, 0.0))
+        losses.append(max(-delta, 0.0))
+        ranges.append(max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])))
+    gain, loss = loop_ema(gains, 1 / 14)[-1], loop_ema(losses, 1 / 14)[-1]
+    rsi = 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+    return rsi, loop_ema(close, 2 / 13)[-1], loop_ema(close, 2 / 27)[-1], loop_ema(ranges, 1 / 14)[-1]
+
+
+def timed(function, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        function(*args)
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def main():
+    for size in SIZES:
+        candles = make_candles(size)
+        expected = loop_ema(candles["close"].tolist(), 2 / 13)
+        error = np.max(np.abs(ema(candles["close"], 2 / 13) - expected) / np.abs(expected))
+
+        vectorized_ms = timed(compute_indicators, candles)
+        loop_ms = timed(loop_indicators, candles)
+        print(f"{size:>7,} bars: {vectorized_ms:7.2f} ms vectorized, {loop_ms:8.2f} ms Python loops "
+              f"({loop_ms / vectorized_ms:.1f}x), max EMA rel. error {error:.1e}")
+
+    print(compute_indicators(make_candles(1_000)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Replay a burst of Finnhub trade frames through the old and the staged ingest path.
+
+The old path decodes with json.loads and spawns one handler task per frame; the
+pipeline enqueues raw frames, collapses to the latest trade per symbol each tick and
+fans out on a fixed set of workers. Each handler call costs HANDLER_LATENCY, like a
+DM send would. Reports frames per second and tracemalloc peak for both.
+
+    python -m benchmarks.ingest_bench
+"""
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+
+from bot.cogs.watchlist.ingest import TradeIngest, decode_json
+
+FRAMES = 50_000
+SYMBOLS = 500
+RECV_CHUNK = 200  # frames handed over per event-loop turn, roughly a busy socket read
+HANDLER_LATENCY = 0.002
+
+
+def make_frames() -> list[str]:
+    frames = []
+    now = int(time.time() * 1000)
+    for i in range(FRAMES):
+        trades = [
+            {"s": f"SYM{random.randrange(SYMBOLS)}", "p": round(random.uniform(10, 500), 2), "t": now + i, "v": 1}
+            for _ in range(random.randint(1, 3))
+        ]
+        frames.append(json.dumps({"type": "trade", "data": trades}))
+    return frames
+
+
+async def handle_trade(trade: dict):
+    await asyncio.sleep(HANDLER_LATENCY)
+
+
+async def run_task_per_frame(frames: list[str]) -> dict:
+    tasks = set()
+
+    async def handle_data(data: dict):
+        for trade in data.get("data", []):
+            await handle_trade(trade)
+
+    peak_tasks = 0
+    for start in range(0, len(frames), RECV_CHUNK):
+        for message in frames[start:start + RECV_CHUNK]:
+            task = asyncio.create_task(handle_data(json.loads(message)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        peak_tasks = max(peak_tasks, len(tasks))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return {"peak_tasks": peak_tasks}
+
+
+async def run_pipeline(frames: list[str]) -> dict:
+    ingest = TradeIngest(handle_trade, maxsize=10_000, tick=0.05, workers=8)
+    ingest.start()
+    for start in range(0, len(frames), RECV_CHUNK):
+        for message in frames[start:start + RECV_CHUNK]:
+            ingest.submit(message)
+        await asyncio.sleep(0)
+    await ingest.drain()
+    ingest.stop()
+    stats = ingest.stats()
+    return {key: stats[key] for key in ("trades", "collapsed", "handled", "dropped_raw", "dropped_trades", "max_raw_depth")}
+
+
+async def measure(name: str, runner, frames: list[str]):
+    tracemalloc.start()
+    started = time.perf_counter()
+    extra = await runner(frames)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    details = ", ".join(f"{key}={value}" for key, value in extra.items())
+    print(f"{name:>14}: {len(frames) / elapsed:>10,.0f} frames/s  peak {peak / 1024 / 1024:>7.1f} MiB  ({details})")
+
+
+async def main():
+    frames = make_frames()
+    print(f"{FRAMES} frames over {SYMBOLS} symbols, decoder: {decode_json.__module__}")
+    await measure("task per frame", run_task_per_frame, frames)
+    await measure("pipeline", run_pipeline, frames)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""
+Event-loop lag while real providers are called, measured with LoopLagMonitor.
+
+The first row calls yfinance directly on the loop (the old behaviour) to show what a
+stall looks like; the second runs a mixed watchlist through MarketData, which should
+keep max lag within a few milliseconds. Needs network access and FINNHUB_KEY.
+
+    python -m benchmarks.loop_lag_bench
+"""
+import asyncio
+
+import yfinance as yf
+
+from bot.api.http_client import HttpClient
+from bot.api.index_futures_api import YF_EXECUTOR
+from bot.core.loop_monitor import LoopLagMonitor
+from bot.core.market_data import MarketData
+
+WATCHLIST = [
+    {"symbol": "AAPL", "type": "stock"},
+    {"symbol": "MSFT", "type": "stock"},
+    {"symbol": "bitcoin/usd", "type": "crypto"},
+    {"symbol": "BTCUSDT", "type": "crypto futures"},
+    {"symbol": "EUR/USD", "type": "forex"},
+    {"symbol": "ES", "type": "futures"},
+    {"symbol": "NQ", "type": "futures"},
+]
+
+
+async def measure(label: str, coro):
+    monitor = LoopLagMonitor(interval=0.005, warn_threshold=float("inf"))
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await coro
+    await asyncio.sleep(0.05)
+    monitor.stop()
+    stats = monitor.stats()
+    print(f"{label:<28} max lag {stats['max_lag_ms']:>8.2f}ms  mean {stats['mean_lag_ms']:>6.2f}ms")
+
+
+async def blocking_call():
+    yf.Ticker("ES=F").info
+
+
+async def main():
+    http_client = HttpClient()
+    await http_client.start()
+    market_data = MarketData(http_client=http_client)
+    try:
+        await measure("blocking yfinance on loop", blocking_call())
+        await measure("MarketData.fetch_quotes", market_data.fetch_quotes(WATCHLIST))
+    finally:
+        await http_client.close()
+        YF_EXECUTOR.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
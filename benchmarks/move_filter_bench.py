@@ -0,0 +1,59 @@
+"""
+DM volume with and without the significant-move filter on simulated tickers.
+
+Replays a trading day of one-second trades (random walk) for a quiet and a
+volatile ticker to WATCHERS users with the default 30s delay. "delay only" sends
+whenever the delay has passed; the filter additionally needs a move above the
+threshold or DEFAULT_MAX_SILENCE without a DM.
+
+    python -m benchmarks.move_filter_bench
+"""
+import random
+
+from bot.cogs.watchlist.subscriber_index import SubscriberIndex
+
+WATCHERS = 100
+SECONDS = 6 * 60 * 60 + 30 * 60
+TICKERS = {"QUIET": 0.00005, "VOLATILE": 0.0005}  # per-second volatility of the random walk
+THRESHOLDS = [(0.0, False), (0.5, True), (1.0, True)]
+
+
+def price_path(volatility: float, seed: int) -> list[float]:
+    rng = random.Random(seed)
+    price = 100.0
+    path = []
+    for _ in range(SECONDS):
+        price *= 1 + rng.gauss(0, volatility)
+        path.append(round(price, 2))
+    return path
+
+
+def count_dms(path: list[float], threshold: float, percent: bool, filtered: bool) -> int:
+    index = SubscriberIndex()
+    key = ("stock", "TICK")
+    for user_id in range(WATCHERS):
+        index._add(user_id, key)
+        index.set_threshold(user_id, key, threshold, percent)
+        if not filtered:
+            index.set_max_silence(user_id, 0)
+
+    sent = 0
+    for second, price in enumerate(path, start=1):
+        sent += len(index.due_users(key, float(second), price))
+    return sent
+
+
+def main():
+    print(f"{WATCHERS} watchers, {SECONDS} one-second trades per ticker")
+    print(f"{'ticker':>9} {'threshold':>10} {'delay only':>11} {'filtered':>9} {'reduction':>10}")
+    for seed, (ticker, volatility) in enumerate(TICKERS.items()):
+        path = price_path(volatility, seed)
+        baseline = count_dms(path, 0.0, False, filtered=False)
+        for threshold, percent in THRESHOLDS:
+            filtered = count_dms(path, threshold, percent, filtered=True)
+            label = f"{threshold}%" if percent else "any move"
+            print(f"{ticker:>9} {label:>10} {baseline:>11,} {filtered:>9,} {baseline / max(filtered, 1):>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Sharded Finnhub connections against the local fake server.
+
+Starts a ShardPool on SYMBOLS watched symbols, reports message throughput and how
+the symbols spread over the shards, then adds a shard and counts how many symbols
+had to move. Consistent hashing should move roughly 1/K of them, not all.
+Finally every connection is dropped to check the subscriptions are replayed.
+
+    python -m benchmarks.shard_bench
+"""
+import asyncio
+import time
+
+from benchmarks.fake_finnhub_server import FakeFinnhubServer
+from bot.cogs.watchlist.shards import ShardPool
+
+SYMBOLS = 400
+SHARDS = 4
+SAMPLE_SECONDS = 2.0
+
+
+async def settle(server: FakeFinnhubServer, pool: ShardPool, timeout: float = 5.0):
+    """Wait until the server sees exactly the symbols the pool wants, one connection per shard."""
+
+    expected = sorted(len(pool.symbols_for(shard_id)) for shard_id in pool.shards)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if sorted(len(symbols) for symbols in server.subscribed()) == expected:
+            return
+        await asyncio.sleep(0.05)
+    raise TimeoutError("shards did not converge on the desired subscriptions")
+
+
+async def main():
+    server = FakeFinnhubServer(port=8765)
+    await server.start()
+
+    watched = {f"SYM{i}" for i in range(SYMBOLS)}
+    received = 0
+
+    def on_message(message: str):
+        nonlocal received
+        received += 1
+
+    pool = ShardPool(
+        server.url,
+        desired=lambda: watched,
+        on_message=on_message,
+        shard_count=SHARDS,
+        max_symbols_per_shard=SYMBOLS // SHARDS,
+        max_shards=SHARDS + 1
+    )
+    pool.start()
+    await settle(server, pool)
+
+    before = {symbol: pool.ring.shard_for(symbol) for symbol in watched}
+    received = 0
+    await asyncio.sleep(SAMPLE_SECONDS)
+    print(f"{SHARDS} shards, {SYMBOLS} symbols: {received / SAMPLE_SECONDS:,.0f} msgs/s")
+    for shard_id, shard in pool.shards.items():
+        print(f"  shard {shard_id}: {shard.stats()['symbols']:>4} symbols, {shard.messages:>6} messages")
+
+    subscribes, unsubscribes = server.subscribes, server.unsubscribes
+    pool.add_shard()
+    await settle(server, pool)
+    moved = sum(1 for symbol in watched if pool.ring.shard_for(symbol) != before[symbol])
+    print(
+        f"added shard {len(pool.shards) - 1}: {moved} symbols moved ({moved / SYMBOLS:.0%}), "
+        f"{server.subscribes - subscribes} subscribe / {server.unsubscribes - unsubscribes} unsubscribe frames"
+    )
+
+    await server.drop_all()
+    await asyncio.sleep(0.1)
+    await settle(server, pool, timeout=10.0)
+    connects = sum(shard.connects for shard in pool.shards.values())
+    print(f"after dropping every connection: {connects} connects total, all subscriptions replayed")
+
+    pool.stop()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Memory per (user, symbol) subscription: the old string/dict layout vs SubscriberIndex.
+
+The old layout is what Watchlist used to build: ``symbol -> [str(user_id), ...]``,
+``str(user_id) -> delay`` and a nested ``defaultdict`` of last-sent timestamps that
+holds every pair once it has been sent. The compact layout is SubscriberIndex with
+every pair's throttle slot marked. Sizes come from tracemalloc.
+
+    python -m benchmarks.subscriber_memory_bench
+"""
+import gc
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from bot.cogs.watchlist.subscriber_index import SubscriberIndex
+
+SIZES = [10_000, 100_000, 1_000_000]
+SYMBOLS_PER_USER = 10
+SYMBOL_UNIVERSE = 5_000
+BASE_USER_ID = 300_000_000_000_000_000  # Discord snowflakes are 18-19 digit integers
+
+
+def make_pairs(size: int) -> list[tuple[int, str]]:
+    rng = random.Random(size)
+    symbols = [f"SYM{i}" for i in range(SYMBOL_UNIVERSE)]
+    pairs = []
+    for user in range(size // SYMBOLS_PER_USER):
+        user_id = BASE_USER_ID + user * 7919
+        for symbol in rng.sample(symbols, SYMBOLS_PER_USER):
+            pairs.append((user_id, symbol))
+    return pairs
+
+
+def build_legacy(pairs: list[tuple[int, str]]):
+    symbol_to_users = defaultdict(list)
+    user_delays = {}
+    last_sent = defaultdict(lambda: defaultdict(lambda: 0))
+    now = time.time()
+    for user_id, symbol in pairs:
+        symbol_to_users[symbol].append(str(user_id))
+        user_delays[str(user_id)] = 30
+        last_sent[str(user_id)][symbol] = now
+    return symbol_to_users, user_delays, last_sent
+
+
+def build_compact(pairs: list[tuple[int, str]]):
+    index = SubscriberIndex()
+    now = time.time()
+    for user_id, symbol in pairs:
+        key = ("stock", symbol)
+        index._add(user_id, key)
+        index.user_delays[user_id] = 30
+    for key in index.keys():
+        index.due_users(key, now, 1.0)
+    return index
+
+
+def measure(builder, pairs) -> int:
+    gc.collect()
+    tracemalloc.start()
+    state = builder(pairs)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    return current
+
+
+def main():
+    print(f"{'pairs':>10} {'legacy B/sub':>13} {'compact B/sub':>14} {'ratio':>6}")
+    for size in SIZES:
+        pairs = make_pairs(size)
+        legacy = measure(build_legacy, pairs)
+        compact = measure(build_compact, pairs)
+        print(f"{len(pairs):>10,} {legacy / len(pairs):>13.1f} {compact / len(pairs):>14.1f} {legacy / compact:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
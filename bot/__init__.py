@@ -1,7 +1,6 @@
 from dotenv import load_dotenv
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
-from openai import AsyncOpenAI
 
 load_dotenv()
 
@@ -10,6 +9,26 @@ FINNHUB_KEY = os.getenv("FINNHUB_KEY")
 MONGO_URI = os.getenv("MONGO_URI")
 GITHUB_AI_TOKEN = os.getenv("GITHUB_AI_TOKEN")
 
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", 10))
+
+PREWARM_INTERVAL = int(os.getenv("PREWARM_INTERVAL", 60))
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", 25))
+PREWARM_AI_BUDGET = int(os.getenv("PREWARM_AI_BUDGET", 5))
+
+FINNHUB_SHARDS = int(os.getenv("FINNHUB_SHARDS", 1))
+FINNHUB_MAX_SHARDS = int(os.getenv("FINNHUB_MAX_SHARDS", 4))
+FINNHUB_SYMBOLS_PER_SHARD = int(os.getenv("FINNHUB_SYMBOLS_PER_SHARD", 50))
+
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 10000))
+INGEST_TICK = float(os.getenv("INGEST_TICK", 0.25))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 4))
+
+DM_WORKERS = int(os.getenv("DM_WORKERS", 4))
+DM_GLOBAL_RATE = float(os.getenv("DM_GLOBAL_RATE", 40))
+
 
 MONGO_CLIENT = AsyncIOMotorClient(MONGO_URI)
 
@@ -19,5 +38,20 @@ __all__ = [
     "BOT_TOKEN",
     "MONGO_CLIENT",
     "FINNHUB_KEY",
-    "GITHUB_AI_TOKEN"
+    "GITHUB_AI_TOKEN",
+    "HTTP_TIMEOUT",
+    "HTTP_CONNECT_TIMEOUT",
+    "HTTP_MAX_CONNECTIONS",
+    "HTTP_MAX_PER_HOST",
+    "PREWARM_INTERVAL",
+    "PREWARM_TOP_N",
+    "PREWARM_AI_BUDGET",
+    "FINNHUB_SHARDS",
+    "FINNHUB_MAX_SHARDS",
+    "FINNHUB_SYMBOLS_PER_SHARD",
+    "INGEST_QUEUE_SIZE",
+    "INGEST_TICK",
+    "INGEST_WORKERS",
+    "DM_WORKERS",
+    "DM_GLOBAL_RATE"
 ]
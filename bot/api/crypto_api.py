@@ -1,33 +1,80 @@
-import aiohttp
 import asyncio
 
-async def get_crypto_price(crypto_id: str, currency: str = None):
+import httpx
+
+from bot.api.http_client import HttpClient
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+COINGECKO_OHLC_URL = "https://api.coingecko.com/api/v3/coins/{id}/ohlc"
+# /coins/markets returns at most 250 rows per page
+COINGECKO_CHUNK_SIZE = 250
+
+
+def _parse_market(data: dict) -> dict:
+    return {
+        "name": data["name"],
+        "symbol": data["symbol"],
+        "current_price": data["current_price"],
+        "market_cap_rank" : data["market_cap_rank"],
+        "total_volume": data["total_volume"],
+        "percent_change": round(data["price_change_percentage_24h"], 2)
+    }
+
+
+async def _get_markets_chunk(client: HttpClient, ids: list[str], currency: str) -> dict[str, dict]:
+    params = {"vs_currency": currency, "ids": ",".join(ids), "per_page": len(ids)}
+
+    try:
+        raw_data = await client.get_json(COINGECKO_MARKETS_URL, params=params)
+    except httpx.HTTPError as e:
+        return {crypto_id: {"error": f"Network error: {str(e)}"} for crypto_id in ids}
+    except Exception as e:
+        return {crypto_id: {"error": f"Unexpected error: {str(e)}"} for crypto_id in ids}
+
+    # Rate limits and bad parameters come back as an error object instead of the list of markets
+    if not isinstance(raw_data, list):
+        return {crypto_id: {"error": f"Unexpected response: {str(raw_data)[:200]}"} for crypto_id in ids}
+
+    results = {}
+    for data in raw_data:
+        # A row we cannot attribute to an id is skipped; its id then reports "Invalid symbol" below
+        if not isinstance(data, dict) or not isinstance(data.get("id"), str):
+            continue
+        try:
+            results[data["id"]] = _parse_market(data)
+        except Exception as e:
+            results[data["id"]] = {"error": f"Unexpected error: {str(e)}"}
+
+    for crypto_id in ids:
+        results.setdefault(crypto_id, {"error": "Invalid symbol"})
+    return results
+
+
+async def get_crypto_prices(client: HttpClient, ids: list[str], currency: str = None) -> dict[str, dict]:
+    """Quotes for many coins in one request per ``COINGECKO_CHUNK_SIZE`` ids, keyed by CoinGecko id."""
 
     if not currency:
         currency = "usd"
-    url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency={currency.lower()}&ids={crypto_id}"
+    ids = list(dict.fromkeys(ids))
+    chunks = [ids[i:i + COINGECKO_CHUNK_SIZE] for i in range(0, len(ids), COINGECKO_CHUNK_SIZE)]
 
-    try:
-        async with aiohttp.ClientSession() as client:
-            async with client.get(url) as response:
-                raw_data = await response.json()
-
-                data = raw_data[0]
-                return {
-                    "name": data["name"],
-                    "symbol": data["symbol"],
-                    "current_price": data["current_price"],
-                    "market_cap_rank" : data["market_cap_rank"],
-                    "total_volume": data["total_volume"],
-                    "percent_change": round(data["price_change_percentage_24h"], 2)
-                }
-    except aiohttp.ClientError as e:
-        return {"error": f"Network error: {str(e)}"}
+    results = {}
+    for chunk_result in await asyncio.gather(*(_get_markets_chunk(client, chunk, currency.lower()) for chunk in chunks)):
+        results.update(chunk_result)
+    return results
 
-    except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+
+async def get_crypto_price(client: HttpClient, crypto_id: str, currency: str = None):
+    prices = await get_crypto_prices(client, [crypto_id], currency)
+    return prices[crypto_id]
+
+
+async def get_crypto_ohlc(client: HttpClient, crypto_id: str, currency: str = "usd", days: int = 30) -> list[list]:
+    """Raw candles ``[time ms, open, high, low, close]``; 30 days comes back as 4h candles."""
+
+    return await client.get_json(COINGECKO_OHLC_URL.format(id=crypto_id), params={"vs_currency": currency, "days": days})
 
 
 #
-# info = asyncio.run(get_crypto_price("binancecoin", "usd"))
-# print(info)
\ No newline at end of file
+# info = asyncio.run(get_crypto_prices(client, ["bitcoin", "binancecoin"], "usd"))
+# print(info)
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+class HttpClient:
+    """One long-lived, pooled HTTP client shared by every market-data provider.
+
+    The Bot owns a single instance: ``start()`` runs in ``setup_hook`` and ``close()``
+    on shutdown, so quotes reuse warm keep-alive connections instead of paying a new
+    TCP+TLS handshake per call. ``per_host_limit`` caps concurrent requests (and so
+    open connections) to any one upstream.
+    """
+
+    def __init__(
+            self,
+            timeout: float = 10.0,
+            connect_timeout: float = 5.0,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            keepalive_expiry: float = 30.0,
+            per_host_limit: int = 10
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.per_host_limit = per_host_limit
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            logging.info("[HTTP] Shared client started")
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logging.info("[HTTP] Shared client closed")
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            raise RuntimeError("HttpClient is not started, call start() first")
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def get_json(self, url: str, params: Optional[dict] = None) -> Any:
+        """GET ``url`` and return the decoded JSON body, raising ``httpx.HTTPError`` on failure."""
+
+        async with self._host_semaphore(url):
+            response = await self.client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
@@ -1,38 +1,122 @@
 import asyncio
+import datetime
 import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+import numpy as np
 import yfinance as yf
 
+# yfinance is synchronous; it only ever runs on this small pool so a slow Yahoo
+# request can never block the event loop or starve the default executor.
+YF_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="yfinance")
 
-async def get_index_futures_data(symbol: str) -> Optional[dict]:
+# yf.download keeps its results in module-level state, so two downloads must never overlap
+_DOWNLOAD_LOCK = threading.Lock()
 
-    try:
-        ticker = yf.Ticker(symbol)
-        raw_data = ticker.info
-        if not raw_data or "regularMarketPrice" not in raw_data:
-            return {
+
+def _download_quotes(symbols: list[str]) -> dict[str, dict]:
+    """Last two daily bars for every symbol in one yf.download call, reduced to the quote fields we use."""
+
+    with _DOWNLOAD_LOCK:
+        frame = yf.download(
+            tickers=symbols,
+            period="5d",
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            multi_level_index=True
+        )
+
+    results = {}
+    for symbol in symbols:
+        try:
+            bars = frame[symbol].dropna(subset=["Close"])
+        except KeyError:
+            bars = None
+
+        if bars is None or bars.empty:
+            results[symbol] = {
                 "symbol": symbol,
                 "error": "Data not found or invalid symbol."
             }
+            continue
 
-        regularMarketPrice = raw_data.get("regularMarketPrice", None)
-        percent_change = raw_data.get("regularMarketChangePercent", 0.0)
-        volume = raw_data.get("regularMarketVolume", 0)
+        regularMarketPrice = float(bars["Close"].iloc[-1])
+        previous_close = float(bars["Close"].iloc[-2]) if len(bars) > 1 else float(bars["Open"].iloc[-1])
+        percent_change = (regularMarketPrice - previous_close) / previous_close * 100 if previous_close else 0.0
+        volume = float(bars["Volume"].iloc[-1])
 
-        return {
+        results[symbol] = {
             "symbol" : symbol,
             "current_price": regularMarketPrice,
             "percent_change": round(percent_change, 2),
-            "volume": volume
+            "volume": 0 if math.isnan(volume) else int(volume)
         }
+    return results
+
+
+async def get_index_futures_batch(symbols: list[str]) -> dict[str, dict]:
+    """Quotes for many ``=F`` / ``=X`` symbols at once, keyed by symbol."""
+
+    symbols = list(dict.fromkeys(symbols))
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(YF_EXECUTOR, _download_quotes, symbols)
+    except Exception as e:
+        logging.error(f"HTTPError for symbols {symbols}: {e}")
+        return {symbol: {"error": "Invalid symbol"} for symbol in symbols}
+
+
+def _download_history(symbol: str, period: str, interval: str, start: Optional[int]) -> Optional[dict[str, np.ndarray]]:
+    """OHLCV candles as NumPy columns (``time`` in epoch seconds), or None when Yahoo has none."""
+
+    # Ticker.history keeps no module-level state, so unlike yf.download it needs no lock
+    ticker = yf.Ticker(symbol)
+    if start is not None:
+        # A day of overlap covers exchanges whose daily bars start before midnight UTC
+        since = datetime.datetime.fromtimestamp(start - 86_400, tz=datetime.timezone.utc).date()
+        frame = ticker.history(start=since.isoformat(), interval=interval, auto_adjust=False)
+    else:
+        frame = ticker.history(period=period, interval=interval, auto_adjust=False)
+    frame = frame.dropna(subset=["Close"])
+    if frame.empty:
+        return None
+    return {
+        "time": frame.index.asi8 // 1_000_000_000,
+        "open": frame["Open"].to_numpy(dtype=np.float64),
+        "high": frame["High"].to_numpy(dtype=np.float64),
+        "low": frame["Low"].to_numpy(dtype=np.float64),
+        "close": frame["Close"].to_numpy(dtype=np.float64),
+        "volume": np.nan_to_num(frame["Volume"].to_numpy(dtype=np.float64)),
+    }
+
 
+async def get_history(
+        symbol: str,
+        period: str = "1y",
+        interval: str = "1d",
+        start: Optional[int] = None
+) -> Optional[dict[str, np.ndarray]]:
+    """Candles for a stock, ``=F`` or ``=X`` symbol from Yahoo, fetched on the yfinance pool.
+
+    With ``start`` (epoch seconds) only the candles from there on are fetched instead of ``period``.
+    """
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(YF_EXECUTOR, _download_history, symbol, period, interval, start)
     except Exception as e:
-        logging.error(f"HTTPError for symbol {symbol}: {e}")
-        return {"error": "Invalid symbol"}
+        logging.error(f"[HISTORY] Could not load {symbol} {interval} candles: {e}")
+        return None
 
-# info = asyncio.run(get_index_futures_data("nq=f"))
-# print(info)
 
-# data = yf.Ticker("USDINR=X")
-# print(data.info)
\ No newline at end of file
+async def get_index_futures_data(symbol: str) -> Optional[dict]:
+    quotes = await get_index_futures_batch([symbol])
+    return quotes[symbol]
+
+# info = asyncio.run(get_index_futures_batch(["NQ=F", "ES=F", "EURUSD=X"]))
+# print(info)
\ No newline at end of file
@@ -1,13 +1,13 @@
 import asyncio
 
-import finnhub
 from bot import  FINNHUB_KEY
+from bot.api.http_client import HttpClient
 
 
-async def get_stock_price(symbol: str):
+async def get_stock_price(client: HttpClient, symbol: str):
+    url = "https://finnhub.io/api/v1/quote"
     try:
-        finnhub_client = finnhub.Client(api_key= FINNHUB_KEY)
-        quote = finnhub_client.quote(symbol=symbol)
+        quote = await client.get_json(url, params={"symbol": symbol, "token": FINNHUB_KEY})
 
         return {
             "symbol": symbol,
@@ -25,5 +25,5 @@ async def get_stock_price(symbol: str):
         return {"error": "Invalid symbol"}
 
 
-# info = asyncio.run(get_stock_price("AAPL"))
+# info = asyncio.run(get_stock_price(client, "AAPL"))
 # print(info)
\ No newline at end of file
@@ -1,133 +1,122 @@
+import asyncio
 import logging
+import time
 
+import discord
 from discord.ext import commands
 
-from bot.api.crypto_api import get_crypto_price
-from bot.api.future_crypto_api import future_crypto_api
-from bot.api.index_futures_api import get_index_futures_data
-from bot.api.stock_api import get_stock_price
-from bot.core.ai import generate_market_ai_response
+from bot.core.ai import insight_cache, stream_market_ai_response
 from bot.core.constant import type_list, TradeType
 from bot.core.embed_builder import generic_embed
+from bot.core.indicators import wait_snapshot
+from bot.core.market_data import normalize_symbol
+from bot.core.metrics import LatencyStats
+
+# Minimum seconds between message edits while the AI insight streams in
+EDIT_INTERVAL = 1.0
+AI_FALLBACK = "⚠️ Could not generate AI insight at the moment. Please try again later."
+# Embed descriptions are capped at 4096 characters
+MAX_DESCRIPTION = 4096
 
 
 class MarketAi(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-
+        self.time_to_first_embed = LatencyStats()
+        self.time_to_final_edit = LatencyStats()
+
+
+    @staticmethod
+    def quote_fields(trade_type: str, data: dict) -> list[tuple[str, str, bool]]:
+        fields = [
+            ("🪙 Symbol", data.get("symbol", 'N/A'), True),
+            ("💵 Current Price", f"${data.get('current_price', 'N/A')}", True),
+            ("📈 Percent Change", f"{data.get('percent_change', 0.0)}%", True),
+        ]
+        if trade_type == TradeType.CRYPTO.value:
+            fields.append(("📊 Total Volume", f"{data.get('total_volume', 0.0):,}", True))
+        elif trade_type != TradeType.STOCK.value:
+            fields.append(("📊 Total Volume", f"{data.get('volume', 0.0):,}", True))
+        if "vwap" in data:
+            fields.append(("📏 Day Range", f"${data['day_low']} - ${data['day_high']}", True))
+            fields.append(("⚖️ VWAP", f"${data['vwap']}", True))
+            fields.append(("📊 Day Volume", f"{data['day_volume']:,.0f}", True))
+        elif "stream_vwap" in data:
+            # Streaming started mid-day, so these only cover the trades seen since then
+            since = data["stream_since"]
+            fields.append(("📏 Day Range", f"${data.get('day_low', 'N/A')} - ${data.get('day_high', 'N/A')}", True))
+            fields.append((f"⚖️ VWAP since {since}", f"${data['stream_vwap']}", True))
+            fields.append((f"📊 Volume since {since}", f"{data['stream_volume']:,.0f}", True))
+        return fields
+
+    @staticmethod
+    def insight_description(symbol: str, insight: str) -> str:
+        return f">>> **{symbol}**\n{insight}"[:MAX_DESCRIPTION]
+
+    async def stream_insight(self, message: discord.Message, embed: discord.Embed, symbol: str, market_data: dict):
+        """Edit ``message`` with the AI insight as tokens arrive, at most once per ``EDIT_INTERVAL``."""
+
+        insight = ""
+        last_edit = time.monotonic()
+        async for text in stream_market_ai_response(live_data=market_data):
+            insight += text
+            if time.monotonic() - last_edit >= EDIT_INTERVAL:
+                embed.description = self.insight_description(symbol, f"{insight} ▌")
+                await message.edit(embed=embed)
+                last_edit = time.monotonic()
+
+        embed.description = self.insight_description(symbol, insight or AI_FALLBACK)
+        await message.edit(embed=embed)
 
     @commands.hybrid_command(name="market", description="Get market insight by ai")
     async def market(self, ctx: commands.Context, symbol: str, trade_type: str):
+        started = time.perf_counter()
         await ctx.defer()
 
-        if trade_type.lower() not in type_list:
+        trade_type = trade_type.lower()
+        if trade_type not in type_list:
             await ctx.send(f"Type not supported, user this type please: {", ".join(type_list)} ")
             return
         try:
-            if trade_type.lower() == TradeType.CRYPTO.value:
-                print("checking crypto")
-                crypto_id , currency = symbol.split("/")
-                crypto_data = await get_crypto_price(crypto_id=crypto_id.lower(), currency= currency.lower())
-                if "error" in crypto_data:
-                    return
-                ai_response = await generate_market_ai_response(live_data=crypto_data)
-                if not ai_response:
-                    ai_description = "⚠️ Could not generate AI insight at the moment. Please try again later."
-                else:
-                    ai_description = ai_response
-
-                fields = [
-                    ("🪙 Symbol", crypto_data.get("symbol", 'N/A'), True),
-                    ("💵 Current Price", f"${crypto_data.get('current_price', 'N/A')}", True),
-                    ("📈 Percent Change", f"{crypto_data.get('percent_change', 0.0)}%", True),
-                    ("📊 Total Volume", f"{crypto_data.get('total_volume', 0.0):,}", True),
-                ]
-
-            elif trade_type.lower() == TradeType.STOCK.value:
-                print("checking stock")
-                stock_data = await get_stock_price(symbol=symbol.upper())
-                if "error" in stock_data:
-                    return
-                ai_response = await generate_market_ai_response(live_data=stock_data)
-                if not ai_response:
-                    ai_description = "⚠️ Could not generate AI insight at the moment. Please try again later."
-                else:
-                    ai_description = ai_response
-
-                fields = [
-                    ("🪙 Symbol", stock_data.get("symbol", 'N/A'), True),
-                    ("💵 Current Price", f"${stock_data.get('current_price', 'N/A')}", True),
-                    ("📈 Percent Change", f"{stock_data.get('percent_change')} %", True),
-                ]
-
-            elif trade_type.lower() == TradeType.FOREX.value:
-                print("checking forex")
-                symbol = symbol.split("/")
-                asset, currency = symbol
-                forex_data = await get_index_futures_data(symbol=f"{asset}{currency}=X")
-                if "error" in forex_data:
-                    return
-                ai_response = await generate_market_ai_response(live_data=forex_data)
-                if not ai_response:
-                    ai_description = "⚠️ Could not generate AI insight at the moment. Please try again later."
-                else:
-                    ai_description = ai_response
-
-                fields = [
-                    ("🪙 Symbol", forex_data.get("symbol", 'N/A'), True),
-                    ("💵 Current Price", f"${forex_data.get('current_price', 'N/A')}", True),
-                    ("📈 Percent Change", f"{forex_data.get('percent_change', 0.0)}%", True),
-                    ("📊 Total Volume", f"{forex_data.get('total_volume', 0.0):,}", True),
-                ]
-
-            elif trade_type.lower() == TradeType.INDICES_FUTURES.value:
-                print("checking future")
-                index_data = await get_index_futures_data(symbol= f"{symbol}=F")
-                if "error" in index_data:
-                    return
-                ai_response = await generate_market_ai_response(live_data=index_data)
-                if not ai_response:
-                    ai_description = "⚠️ Could not generate AI insight at the moment. Please try again later."
-                else:
-                    ai_description = ai_response
-
-                fields = [
-                    ("🪙 Symbol", index_data.get("symbol", 'N/A'), True),
-                    ("💵 Current Price", f"${index_data.get('current_price', 'N/A')}", True),
-                    ("📈 Percent Change", f"{index_data.get('percent_change', 0.0)}%", True),
-                    ("📊 Total Volume", f"{index_data.get('total_volume', 0.0):,}", True),
-                ]
-
-            elif trade_type.lower() == TradeType.CRYPTO_FUTURES.value:
-                print("checking future")
-                crypto_future_data = await future_crypto_api(symbol)
-                if "error" in crypto_future_data:
-                    return
-                ai_response = await generate_market_ai_response(live_data=crypto_future_data)
-                if not ai_response:
-                    ai_description = "⚠️ Could not generate AI insight at the moment. Please try again later."
-                else:
-                    ai_description = ai_response
-
-                fields = [
-                    ("🪙 Symbol", crypto_future_data.get("symbol", 'N/A'), True),
-                    ("💵 Current Price", f"${crypto_future_data.get('current_price', 'N/A')}", True),
-                    ("📈 Percent Change", f"{crypto_future_data.get('percent_change', 0.0)}%", True),
-                    ("📊 Total Volume", f"{crypto_future_data.get('total_volume', 0.0):,}", True),
-                ]
-
-            else:
-                ai_description = "No Response"
-                fields = []
-
+            print(f"checking {trade_type}")
+            # Candles load alongside the quote; only the AI phase waits for them
+            indicator_task = asyncio.create_task(self.bot.indicators.snapshot(trade_type, symbol))
+            market_data = await self.bot.market_data.fetch_quote(trade_type, symbol)
+            if "error" in market_data:
+                indicator_task.cancel()
+                return
+            # Only symbols the provider knows count towards pre-warming, not typos
+            self.bot.prewarm.record_request(trade_type, symbol)
+            if trade_type == TradeType.STOCK.value:
+                # VWAP and volume from the live trade bars, when the symbol is streamed. The bars only
+                # cover trades seen since streaming started, so the provider's day high/low/open win,
+                # and a window that began mid-day is labelled stream_* rather than passed off as the day
+                market_data = {**self.bot.trade_bars.day_stats(normalize_symbol(trade_type, symbol)), **market_data}
+
+            # Phase one: the quote goes out as soon as the provider answers
             embed = generic_embed(
                 title="🤖 TU Helper",
-                description= f">>> **{symbol}**\n{ai_description}",
-                fields=fields
+                description=self.insight_description(symbol, "⏳ Generating AI insight..."),
+                fields=self.quote_fields(trade_type, market_data)
             )
-
-            await ctx.send(embed= embed)
+            message = await ctx.send(embed= embed)
+            self.time_to_first_embed.record(time.perf_counter() - started)
+
+            # Phase two: the AI insight is streamed into the same embed. A fresh cached insight
+            # is served as is; only a new or refreshed one waits for the indicators in its prompt
+            if not insight_cache.is_fresh(market_data):
+                indicators = await wait_snapshot(indicator_task)
+                if indicators:
+                    market_data = {**market_data, "indicators": indicators}
+            await self.stream_insight(message, embed, symbol, market_data)
+            self.time_to_final_edit.record(time.perf_counter() - started)
         except Exception as  e:
             logging.error(f"[MARKET ERROR] Error getting market ai response {e}")
 
+    def stats(self) -> dict:
+        return {
+            "first_embed": self.time_to_first_embed.stats(),
+            "final_edit": self.time_to_final_edit.stats(),
+        }
+
 
@@ -0,0 +1,4 @@
+from bot.cogs.stats.stats import Stats
+
+async def setup(bot):
+    await bot.add_cog(Stats(bot))
\ No newline at end of file
@@ -0,0 +1,62 @@
+import datetime
+
+from discord.ext import commands
+
+from bot.core.ai import ai_scheduler, brief_token_stats, insight_cache
+from bot.core.embed_builder import generic_embed
+
+
+def format_stats(stats: dict) -> str:
+    lines = []
+    for name, value in stats.items():
+        if isinstance(value, dict):
+            inner = ", ".join(f"{k}: {v}" for k, v in value.items())
+            lines.append(f"**{name}**: {inner}")
+        else:
+            lines.append(f"**{name}**: `{value}`")
+    return "\n".join(lines) or "No data yet"
+
+
+class Stats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    def collect_stats(self) -> list[tuple[str, dict]]:
+        sections = [
+            ("⏱️ Event Loop", self.bot.loop_monitor.stats()),
+            ("📡 Futures Snapshot", self.bot.futures_snapshot.stats()),
+        ]
+        market_cog = self.bot.get_cog("MarketAi")
+        if market_cog is not None:
+            sections.append(("🤖 /market Latency", market_cog.stats()))
+        sections.append(("🧠 AI Insight Cache", insight_cache.stats()))
+        sections.append(("🚦 AI Scheduler", ai_scheduler.stats()))
+        sections.append(("📝 Brief Tokens", {
+            **brief_token_stats,
+            "saved": brief_token_stats["dict_repr_tokens"] - brief_token_stats["compact_tokens"],
+        }))
+        sections.append(("🔥 Pre-warm", self.bot.prewarm.stats()))
+        watchlist_cog = self.bot.get_cog("Watchlist")
+        if watchlist_cog is not None:
+            sections.append(("👀 Watchlist Stream", watchlist_cog.stats()))
+            sections.append(("✉️ DM Dispatcher", watchlist_cog.dispatcher.stats()))
+        sections.append(("🕯️ Trade Bars", self.bot.trade_bars.stats()))
+        sections.append(("📐 Indicators", self.bot.indicators.stats()))
+        if self.bot.market_data.cache is not None:
+            sections.append(("🗃️ Quote Cache", self.bot.market_data.cache.stats()))
+        return sections
+
+    @commands.hybrid_command(name="bot_stats", description="Show cache and performance counters")
+    @commands.is_owner()
+    async def bot_stats(self, ctx: commands.Context):
+        fields = [
+            (name, format_stats(stats)[:1024], False)
+            for name, stats in self.collect_stats()
+        ]
+        embed = generic_embed(
+            title="📊 Bot Stats",
+            description="Runtime counters since the last restart.",
+            fields=fields,
+            timestamp=datetime.datetime.now()
+        )
+        await ctx.send(embed=embed, ephemeral=True)
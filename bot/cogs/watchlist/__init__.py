@@ -1,6 +1,9 @@
+from bot.cogs.watchlist.alert_commands import AlertCommands
 from bot.cogs.watchlist.watchlist_commands import WatchlistCommands
 from bot.cogs.watchlist.watchlist import Watchlist
 
 
 async def setup(bot):
-    await bot.add_cog(WatchlistCommands(bot= bot))
\ No newline at end of file
+    await bot.add_cog(WatchlistCommands(bot= bot))
+    await bot.add_cog(AlertCommands(bot= bot))
+    await bot.add_cog(Watchlist(bot= bot))
@@ -0,0 +1,126 @@
+import datetime
+import logging
+import math
+from typing import Optional
+
+import discord
+from discord.ext import commands
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from bot.cogs.watchlist.alerts import ABOVE, BELOW, MAX_ALERTS_PER_USER
+from bot.core.constant import DbConstant, type_list
+from bot.core.embed_builder import generic_embed
+from bot.core.market_data import normalize_symbol
+
+
+def alert_code(alert_id) -> str:
+    """Short id users type into /alert_remove: the last 6 hex digits of the ObjectId."""
+
+    return str(alert_id)[-6:]
+
+
+class AlertCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.alert_collection: AsyncIOMotorCollection = self.bot.db[DbConstant.ALERT_COLLECTION.value]
+
+    async def active_alerts(self, user_id: int) -> list[dict]:
+        cursor = self.alert_collection.find({"user_id": user_id, "fired_at": None}).sort("created_at", 1)
+        return await cursor.to_list(length=MAX_ALERTS_PER_USER)
+
+    @commands.hybrid_command(name="alert_add",
+                             description="DM me when a symbol crosses a price (direction: above/below, optional)")
+    async def alert_add(self, ctx: commands.Context, symbol: str, type: str, price: float, direction: Optional[str] = None):
+        await ctx.defer(ephemeral=True)
+        trade_type = type.lower()
+
+        if trade_type not in type_list:
+            await ctx.send(f"`{type}` is an invalid type. Available types are - `{", ".join(type_list)}`", ephemeral=True)
+            return
+        # nan/inf would break the sorted order the alert books bisect on
+        if not math.isfinite(price) or price <= 0:
+            await ctx.send("Please provide a price above 0.", ephemeral=True)
+            return
+
+        if direction is None:
+            quote = await self.bot.market_data.fetch_quote(trade_type, symbol)
+            if "error" in quote:
+                await ctx.send(f"❌ Could not fetch `{symbol}` to pick a direction, please pass `above` or `below`.",
+                               ephemeral=True)
+                return
+            direction = ABOVE if price > quote["current_price"] else BELOW
+        direction = direction.lower()
+        if direction not in (ABOVE, BELOW):
+            await ctx.send("Direction must be `above` or `below`.", ephemeral=True)
+            return
+
+        count = await self.alert_collection.count_documents({"user_id": ctx.author.id, "fired_at": None})
+        if count >= MAX_ALERTS_PER_USER:
+            await ctx.send(f"❌ You already have {MAX_ALERTS_PER_USER} active alerts. Remove one with `/alert_remove`.",
+                           ephemeral=True)
+            return
+
+        doc = {
+            "user_id": ctx.author.id,
+            "type": trade_type,
+            "symbol": normalize_symbol(trade_type, symbol),
+            "direction": direction,
+            "price": price,
+            "created_at": datetime.datetime.now(datetime.timezone.utc),
+            "fired_at": None,
+        }
+        try:
+            result = await self.alert_collection.insert_one(doc)
+        except Exception as e:
+            logging.error(f"Error adding price alert: {e}")
+            await ctx.send("❌ Failed to add your alert. Please try again", ephemeral=True)
+            return
+
+        doc["_id"] = result.inserted_id
+        self.bot.dispatch("price_alert_added", doc)
+        await ctx.send(
+            f"🔔 Alert `{alert_code(result.inserted_id)}` set: `{doc['symbol']}` {direction} ${price:g}.",
+            ephemeral=True
+        )
+
+    @commands.hybrid_command(name="alert_list", description="List your active price alerts")
+    async def alert_list(self, ctx: commands.Context):
+        await ctx.defer(ephemeral=True)
+        alerts = await self.active_alerts(ctx.author.id)
+        if not alerts:
+            await ctx.send("❌ You don't have any active alerts", ephemeral=True)
+            return
+
+        lines = [
+            f"`{alert_code(alert['_id'])}` • **{alert['symbol']}** ({alert['type']}) {alert['direction']} ${alert['price']:g}"
+            for alert in alerts
+        ]
+        embed = generic_embed(
+            title="🔔 Your Price Alerts",
+            description="\n".join(lines)[:4096],
+            timestamp=datetime.datetime.now()
+        )
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(name="alert_remove", description="Remove a price alert by the code from /alert_list")
+    async def alert_remove(self, ctx: commands.Context, code: str):
+        await ctx.defer(ephemeral=True)
+        code = code.strip().lstrip("#").lower()
+        matches = [alert for alert in await self.active_alerts(ctx.author.id) if alert_code(alert["_id"]) == code]
+        if not matches:
+            await ctx.send(f"❌ Could not find an active alert `{code}`.", ephemeral=True)
+            return
+
+        alert = matches[0]
+        result = await self.alert_collection.delete_one({"_id": alert["_id"], "fired_at": None})
+        if result.deleted_count == 0:
+            await ctx.send(f"Alert `{code}` already fired.", ephemeral=True)
+            return
+
+        self.bot.dispatch("price_alert_removed", alert["_id"])
+        embed = generic_embed(
+            title="Price Alert Removed",
+            description=f"Removed `{alert['symbol']}` {alert['direction']} ${alert['price']:g}.",
+            color=discord.Color.green()
+        )
+        await ctx.send(embed=embed, ephemeral=True)
@@ -0,0 +1,281 @@
+import asyncio
+import datetime
+import itertools
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, NamedTuple, Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+
+from bot.cogs.watchlist.subscriber_index import IndexListener, watch_key
+from bot.core.quote_cache import QuoteKey
+
+ABOVE = "above"
+BELOW = "below"
+MAX_ALERTS_PER_USER = 25
+
+
+class Alert(NamedTuple):
+    alert_id: ObjectId
+    user_id: int
+    key: QuoteKey
+    direction: str
+    price: float
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "Alert":
+        return cls(doc["_id"], int(doc["user_id"]), watch_key(doc), doc["direction"], float(doc["price"]))
+
+
+class ThresholdBook:
+    """One side of one key's alerts: prices sorted ascending with a parallel array of handles.
+
+    Crossed alerts are always a prefix (``above``) or a suffix (``below``) of the
+    book, so a trade costs one bisect and a slice delete of exactly the fired alerts.
+    """
+
+    __slots__ = ("prices", "handles")
+
+    def __init__(self):
+        self.prices = array("d")
+        self.handles = array("q")
+
+    def __len__(self):
+        return len(self.prices)
+
+    def insert(self, price: float, handle: int):
+        index = bisect_right(self.prices, price)
+        self.prices.insert(index, price)
+        self.handles.insert(index, handle)
+
+    def remove(self, price: float, handle: int) -> bool:
+        low, high = bisect_left(self.prices, price), bisect_right(self.prices, price)
+        for index in range(low, high):
+            if self.handles[index] == handle:
+                del self.prices[index]
+                del self.handles[index]
+                return True
+        return False
+
+    def pop_at_or_below(self, price: float) -> array:
+        end = bisect_right(self.prices, price)
+        fired = self.handles[:end]
+        del self.prices[:end]
+        del self.handles[:end]
+        return fired
+
+    def pop_at_or_above(self, price: float) -> array:
+        start = bisect_left(self.prices, price)
+        fired = self.handles[start:]
+        del self.prices[start:]
+        del self.handles[start:]
+        return fired
+
+    def load(self, entries: list[tuple[float, int]]):
+        entries.sort()
+        self.prices = array("d", (price for price, _ in entries))
+        self.handles = array("q", (handle for _, handle in entries))
+
+
+class AlertBook:
+    """In-memory price alerts per (trade type, normalized symbol).
+
+    ``above`` alerts fire once a price is at or over their threshold, ``below``
+    alerts once it is at or under it. ``check`` finds and removes every crossed
+    alert with two bisects and no await in between, so an alert fires at most once.
+    Listeners get (added keys, removed keys) when a key gains its first or loses its
+    last alert, like ``SubscriberIndex`` listeners.
+    """
+
+    def __init__(self):
+        self.alerts: dict[int, Alert] = {}  # handle -> alert
+        self.handles: dict[ObjectId, int] = {}
+        self.books: dict[QuoteKey, tuple[ThresholdBook, ThresholdBook]] = {}  # key -> (above, below)
+        self.listeners: list[IndexListener] = []
+        self._next_handle = itertools.count()
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def keys(self) -> set[QuoteKey]:
+        return set(self.books)
+
+    def _notify(self, added: set[QuoteKey], removed: set[QuoteKey]):
+        if not added and not removed:
+            return
+        for listener in self.listeners:
+            listener(added, removed)
+
+    def add(self, alert: Alert):
+        if alert.alert_id in self.handles:
+            return
+        handle = next(self._next_handle)
+        self.alerts[handle] = alert
+        self.handles[alert.alert_id] = handle
+
+        books = self.books.get(alert.key)
+        first = books is None
+        if first:
+            books = self.books[alert.key] = (ThresholdBook(), ThresholdBook())
+        books[0 if alert.direction == ABOVE else 1].insert(alert.price, handle)
+        if first:
+            self._notify({alert.key}, set())
+
+    def remove(self, alert_id: ObjectId) -> Optional[Alert]:
+        handle = self.handles.pop(alert_id, None)
+        if handle is None:
+            return None
+        alert = self.alerts.pop(handle)
+        books = self.books[alert.key]
+        books[0 if alert.direction == ABOVE else 1].remove(alert.price, handle)
+        self._drop_if_empty(alert.key, books)
+        return alert
+
+    def _drop_if_empty(self, key: QuoteKey, books: tuple[ThresholdBook, ThresholdBook]):
+        if not books[0] and not books[1]:
+            del self.books[key]
+            self._notify(set(), {key})
+
+    def check(self, key: QuoteKey, price: float) -> list[Alert]:
+        """Remove and return every alert on ``key`` that ``price`` crosses."""
+
+        books = self.books.get(key)
+        if books is None:
+            return []
+        above, below = books
+        # Fast path: nothing crossed costs two comparisons against the book edges
+        if (not above or above.prices[0] > price) and (not below or below.prices[-1] < price):
+            return []
+
+        fired = []
+        for handle in (*above.pop_at_or_below(price), *below.pop_at_or_above(price)):
+            alert = self.alerts.pop(handle)
+            del self.handles[alert.alert_id]
+            fired.append(alert)
+        self._drop_if_empty(key, books)
+        return fired
+
+    def load(self, alerts: Iterable[Alert]):
+        """Bulk-load alerts with one sort per book instead of an insert per alert."""
+
+        before = self.keys()
+        entries: dict[QuoteKey, tuple[list, list]] = {}
+        for alert in alerts:
+            if alert.alert_id in self.handles:
+                continue
+            handle = next(self._next_handle)
+            self.alerts[handle] = alert
+            self.handles[alert.alert_id] = handle
+            sides = entries.setdefault(alert.key, ([], []))
+            sides[0 if alert.direction == ABOVE else 1].append((alert.price, handle))
+
+        for key, (above, below) in entries.items():
+            books = self.books.setdefault(key, (ThresholdBook(), ThresholdBook()))
+            for book, side in zip(books, (above, below)):
+                book.load([*zip(book.prices, book.handles), *side])
+        self._notify(self.keys() - before, set())
+
+
+class AlertEngine:
+    """Keeps the ``AlertBook`` loaded from ``alert_collection`` and persists fired alerts.
+
+    Fired alerts leave the book immediately; marking them in Mongo is batched into one
+    ``bulk_write`` per flush. Each update only matches an alert that has not fired yet,
+    so a retried flush never fires it twice.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, flush_interval: float = 2.0):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.book = AlertBook()
+        self.fired: list[tuple[Alert, float, datetime.datetime]] = []
+        self.fired_total = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.loaded = False
+        self.load_failures = 0
+
+    def start(self, scheduler: AsyncIOScheduler):
+        scheduler.add_job(
+            self.flush,
+            "interval",
+            seconds=self.flush_interval,
+            id="price_alert_flush",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+    def stop(self, scheduler: AsyncIOScheduler):
+        if scheduler.get_job("price_alert_flush") is not None:
+            scheduler.remove_job("price_alert_flush")
+
+    async def load(self):
+        await self.collection.create_index([("fired_at", ASCENDING), ("user_id", ASCENDING)])
+        alerts = []
+        async for doc in self.collection.find(
+                {"fired_at": None},
+                projection={"user_id": 1, "type": 1, "symbol": 1, "direction": 1, "price": 1}
+        ):
+            alerts.append(Alert.from_doc(doc))
+        self.book.load(alerts)
+        self.loaded = True
+        logging.info(f"[ALERTS] Loaded {len(alerts)} active alerts on {len(self.book.books)} symbols")
+
+    async def load_with_retry(self, min_backoff: float = 1.0, max_backoff: float = 60.0):
+        """``load`` until it succeeds, so a Mongo hiccup at startup does not leave every stored alert off."""
+
+        backoff = min_backoff
+        while not self.loaded:
+            try:
+                await self.load()
+            except PyMongoError as e:
+                self.load_failures += 1
+                logging.error(f"[ALERTS] Could not load alerts, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(max_backoff, backoff * 2)
+
+    def check(self, key: QuoteKey, price: float) -> list[Alert]:
+        fired = self.book.check(key, price)
+        if fired:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            self.fired.extend((alert, price, now) for alert in fired)
+            self.fired_total += len(fired)
+        return fired
+
+    async def flush(self):
+        if not self.fired:
+            return
+        batch, self.fired = self.fired, []
+        operations = [
+            UpdateOne(
+                {"_id": alert.alert_id, "fired_at": None},
+                {"$set": {"fired_at": fired_at, "fired_price": price}}
+            )
+            for alert, price, fired_at in batch
+        ]
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+            self.flushes += 1
+        except PyMongoError as e:
+            # Keep them for the next flush; the fired_at filter makes the retry idempotent
+            self.flush_failures += 1
+            self.fired = batch + self.fired
+            logging.error(f"[ALERTS] Could not persist {len(batch)} fired alerts: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "load_failures": self.load_failures,
+            "active": len(self.book),
+            "symbols": len(self.book.books),
+            "fired": self.fired_total,
+            "unflushed": len(self.fired),
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+        }
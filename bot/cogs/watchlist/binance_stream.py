@@ -0,0 +1,121 @@
+import itertools
+import json
+import logging
+import time
+from typing import Awaitable, Callable
+
+from bot.api.future_crypto_api import BINANCE_STREAM_URL, _parse_stream_ticker
+from bot.cogs.watchlist.connection import ReconnectingSocket
+from bot.cogs.watchlist.ingest import decode_json
+from bot.cogs.watchlist.subscriptions import SubscriptionManager
+from bot.core.futures_snapshot import FuturesSnapshot, FuturesTicker
+
+TickerHandler = Callable[[str, float], Awaitable[None]]
+
+# Binance caps a connection at 10 incoming messages per second, so streams are subscribed in lists
+STREAMS_PER_FRAME = 100
+
+_request_ids = itertools.count(1)
+
+
+def binance_frames(action: str, symbols: list[str]) -> list[str]:
+    method = "SUBSCRIBE" if action == "subscribe" else "UNSUBSCRIBE"
+    return [
+        json.dumps({
+            "method": method,
+            "params": [f"{symbol.lower()}@ticker" for symbol in symbols[start:start + STREAMS_PER_FRAME]],
+            "id": next(_request_ids),
+        }, separators=(",", ":"))
+        for start in range(0, len(symbols), STREAMS_PER_FRAME)
+    ]
+
+
+class BinanceTickerStream(ReconnectingSocket):
+    """One combined-stream websocket carrying ``<symbol>@ticker`` for every watched perpetual.
+
+    Each event lands in the ``FuturesSnapshot`` live table, which MarketData reads
+    before falling back to the REST snapshot or the per-symbol call, and price changes
+    are pushed to ``on_ticker`` for the watchlist fan-out. Subscriptions follow the
+    watched set through a ``SubscriptionManager`` with list frames; the socket
+    reconnects with jittered exponential backoff and replays them. A frame that
+    cannot be handled is counted and logged without dropping the connection.
+    """
+
+    log_name = "[BINANCE STREAM]"
+
+    def __init__(
+            self,
+            snapshot: FuturesSnapshot,
+            desired: Callable[[], set[str]],
+            on_ticker: TickerHandler,
+            url: str = BINANCE_STREAM_URL,
+            min_backoff: float = 1.0,
+            max_backoff: float = 60.0
+    ):
+        super().__init__(
+            url,
+            SubscriptionManager(desired=desired, name="binance futures", encode=binance_frames),
+            min_backoff=min_backoff,
+            max_backoff=max_backoff
+        )
+        self.snapshot = snapshot
+        self.desired = desired
+        self.on_ticker = on_ticker
+        self.watched: set[str] = set()
+
+        self.events = 0
+        self.pushed = 0
+        self.frame_errors = 0
+        self.last_event_at = 0.0
+
+    def start(self):
+        self.watched = self.desired()
+        super().start()
+
+    def request_sync(self):
+        # Symbols nobody watches any more must not be served from a table that stopped updating
+        self.watched = self.desired()
+        for symbol in [symbol for symbol in self.snapshot.live if symbol not in self.watched]:
+            self.snapshot.discard(symbol)
+        self.subscriptions.request_sync()
+
+    async def receive(self, message):
+        try:
+            await self.handle_message(message)
+        except Exception as e:
+            # One bad frame must not tear down the socket and force a full resubscribe
+            self.frame_errors += 1
+            logging.error(f"[BINANCE STREAM] Could not process frame: {e!r}")
+
+    async def handle_message(self, message):
+        payload = decode_json(message)
+        data = payload.get("data") if isinstance(payload, dict) else None
+        if not isinstance(data, dict) or data.get("e") != "24hrTicker":
+            return  # subscribe acknowledgements and anything else that is not a ticker
+
+        self.events += 1
+        self.last_event_at = time.monotonic()
+        ticker = FuturesTicker(**_parse_stream_ticker(data))
+        if ticker.symbol not in self.watched:
+            return  # still in flight from a stream that is being unsubscribed
+        previous = self.snapshot.update(ticker)
+        if previous is not None and previous.current_price == ticker.current_price:
+            return
+
+        self.pushed += 1
+        try:
+            await self.on_ticker(ticker.symbol, ticker.current_price)
+        except Exception as e:
+            logging.error(f"[BINANCE STREAM] Fan-out failed for {ticker.symbol}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "streams": len(self.subscriptions.active),
+            "events": self.events,
+            "pushed": self.pushed,
+            "idle_s": round(time.monotonic() - self.last_event_at, 1) if self.last_event_at else None,
+            "connects": self.connects,
+            "errors": self.errors,
+            "frame_errors": self.frame_errors,
+        }
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import websockets
+
+from bot.cogs.watchlist.subscriptions import SubscriptionManager
+
+
+class ReconnectingSocket:
+    """One websocket kept open with jittered exponential backoff, replaying its subscriptions on every connect.
+
+    Subclasses implement ``receive`` for each incoming message and set ``log_name``
+    for the log lines; the connection counters are shared by every venue.
+    """
+
+    log_name = "[WEBSOCKET]"
+
+    def __init__(self, url: str, subscriptions: SubscriptionManager, min_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.url = url
+        self.subscriptions = subscriptions
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._task: Optional[asyncio.Task] = None
+
+        self.connected = False
+        self.connects = 0
+        self.errors = 0
+        self.backoff = min_backoff
+
+    def start(self):
+        self.subscriptions.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        self.subscriptions.stop()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def receive(self, message):
+        raise NotImplementedError
+
+    async def _run(self):
+        while True:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self.connected = True
+                    self.connects += 1
+                    self.backoff = self.min_backoff
+                    logging.info(f"{self.log_name} Connected")
+                    self.subscriptions.attach(websocket)
+
+                    async for message in websocket:
+                        await self.receive(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logging.warning(f"{self.log_name} {e}. Reconnecting in {self.backoff:.1f}s...")
+            finally:
+                self.connected = False
+                self.subscriptions.detach()
+
+            await asyncio.sleep(self.backoff * random.uniform(0.5, 1.0))
+            self.backoff = min(self.max_backoff, self.backoff * 2)
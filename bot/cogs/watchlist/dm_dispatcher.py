@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import discord
+
+from bot.core.metrics import LatencyStats
+from bot.core.rate_limit import TokenBucket
+
+# Discord rejects message content over 2000 characters
+MAX_MESSAGE = 2000
+# Seconds a user whose DMs are closed gets no delivery attempts, unless they touch their watchlist or alerts
+UNDELIVERABLE_RETRY = 6 * 3600
+
+
+class DmDispatcher:
+    """Delivers watchlist price updates as DMs without blocking the trade fan-out.
+
+    ``enqueue`` only records the latest price per (user, symbol); a user with pending
+    updates sits in the ready queue once, so everything that arrives before a worker
+    picks them up is coalesced into one message. Workers take a token from the global
+    bucket and from the user's DM route bucket; a user whose route is exhausted is put
+    back on the queue after the bucket's delay instead of holding the worker.
+    ``notify`` queues one-off texts such as fired price alerts; they are never
+    coalesced and go out ahead of the price lines in the user's next message.
+    A user whose DMs are closed (403) or who no longer exists (404) is remembered as
+    undeliverable and their updates are dropped, since Discord counts every invalid
+    request towards its IP ban threshold; ``allow`` clears that early.
+    """
+
+    def __init__(
+            self,
+            bot,
+            workers: int = 4,
+            global_rate: float = 40.0,
+            route_rate: float = 1.0,
+            route_burst: float = 5.0
+    ):
+        self.bot = bot
+        self.worker_count = workers
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.route_buckets: dict[int, TokenBucket] = {}
+        self.channels: dict[int, discord.DMChannel] = {}
+        self.undeliverable: dict[int, float] = {}  # user_id -> monotonic time of the next delivery attempt
+
+        self.pending: dict[int, dict[str, float]] = {}  # user_id -> symbol -> latest price
+        self.notices: dict[int, list[str]] = {}  # user_id -> texts to send as they are
+        self.pending_since: dict[int, float] = {}  # user_id -> monotonic time of the oldest unsent update
+        self.ready: asyncio.Queue[int] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.notified = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+        self.route_waits = 0
+        self.user_fetches = 0
+        self.suppressed = 0
+        self.delivery_latency = LatencyStats()
+        self.send_latency = LatencyStats()
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def _mark_ready(self, user_id: int):
+        # A user is on the ready queue exactly while they have an entry in pending_since
+        if user_id not in self.pending_since:
+            self.pending_since[user_id] = time.monotonic()
+            self.ready.put_nowait(user_id)
+
+    def is_undeliverable(self, user_id: int) -> bool:
+        retry_at = self.undeliverable.get(user_id)
+        if retry_at is None:
+            return False
+        if time.monotonic() < retry_at:
+            return True
+        del self.undeliverable[user_id]
+        return False
+
+    def mark_undeliverable(self, user_id: int):
+        self.undeliverable[user_id] = time.monotonic() + UNDELIVERABLE_RETRY
+        self.channels.pop(user_id, None)
+        self.pending.pop(user_id, None)
+        self.notices.pop(user_id, None)
+
+    def allow(self, user_id: int):
+        """Try delivering to ``user_id`` again, e.g. after they used a command and may have reopened DMs."""
+
+        self.undeliverable.pop(user_id, None)
+
+    def enqueue(self, user_id: int, symbol: str, price: float):
+        if self.is_undeliverable(user_id):
+            self.suppressed += 1
+            return
+        self.enqueued += 1
+        updates = self.pending.get(user_id)
+        if updates is None:
+            updates = self.pending[user_id] = {}
+        elif symbol in updates:
+            self.coalesced += 1
+        updates[symbol] = price
+        self._mark_ready(user_id)
+
+    def notify(self, user_id: int, text: str):
+        if self.is_undeliverable(user_id):
+            self.suppressed += 1
+            return
+        self.notified += 1
+        self.notices.setdefault(user_id, []).append(text)
+        self._mark_ready(user_id)
+
+    def route_bucket(self, user_id: int) -> TokenBucket:
+        bucket = self.route_buckets.get(user_id)
+        if bucket is None:
+            bucket = self.route_buckets[user_id] = TokenBucket(self.route_rate, self.route_burst)
+        return bucket
+
+    async def dm_channel(self, user_id: int) -> Optional[discord.DMChannel]:
+        channel = self.channels.get(user_id)
+        if channel is not None:
+            return channel
+
+        user = self.bot.get_user(user_id)
+        if user is None:
+            self.user_fetches += 1
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                logging.warning(f"[DM] User {user_id} no longer exists, dropping their updates")
+                self.mark_undeliverable(user_id)
+                return None
+            except discord.HTTPException as e:
+                logging.warning(f"[DM] Could not fetch user {user_id}: {e}")
+                return None
+
+        channel = user.dm_channel or await user.create_dm()
+        self.channels[user_id] = channel
+        return channel
+
+    @staticmethod
+    def format_message(notices: list[str], updates: dict[str, float]) -> str:
+        parts = list(notices)
+        if updates:
+            parts.append(DmDispatcher.format_updates(updates))
+        return "\n\n".join(parts)[:MAX_MESSAGE]
+
+    @staticmethod
+    def format_updates(updates: dict[str, float]) -> str:
+        if len(updates) == 1:
+            symbol, price = next(iter(updates.items()))
+            return f"📈 {symbol} price updated: **${price}**"
+        lines = "\n".join(f"• {symbol}: **${price}**" for symbol, price in updates.items())
+        return f"📈 Price updates:\n{lines}"
+
+    def _requeue(self, user_id: int):
+        self.ready.put_nowait(user_id)
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            user_id = await self.ready.get()
+
+            wait = self.route_bucket(user_id).delay()
+            if wait > 0:
+                # Updates keep coalescing while the user waits out their route limit
+                self.route_waits += 1
+                loop.call_later(wait, self._requeue, user_id)
+                continue
+            await self.global_bucket.acquire()
+            self.route_bucket(user_id).take()
+
+            updates = self.pending.pop(user_id, {})
+            notices = self.notices.pop(user_id, [])
+            since = self.pending_since.pop(user_id, None)
+            if not updates and not notices:
+                continue
+
+            started = time.monotonic()
+            try:
+                channel = await self.dm_channel(user_id)
+                if channel is None:
+                    self.failed += 1
+                    continue
+                await channel.send(self.format_message(notices, updates))
+                self.sent += 1
+            except discord.Forbidden as e:
+                self.failed += 1
+                self.mark_undeliverable(user_id)
+                logging.warning(f"[DM] {user_id} does not accept DMs, pausing delivery: {e}")
+                continue
+            except Exception as e:
+                self.failed += 1
+                self.channels.pop(user_id, None)
+                logging.warning(f"[DM] Send to {user_id} failed: {e}")
+                continue
+            finally:
+                self.send_latency.record(time.monotonic() - started)
+            self.delivery_latency.record(time.monotonic() - since)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.ready.qsize(),
+            "pending_users": len(self.pending),
+            "pending_updates": sum(len(updates) for updates in self.pending.values()),
+            "enqueued": self.enqueued,
+            "notices": self.notified,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "failed": self.failed,
+            "route_waits": self.route_waits,
+            "user_fetches": self.user_fetches,
+            "undeliverable": len(self.undeliverable),
+            "suppressed": self.suppressed,
+            "cached_channels": len(self.channels),
+            "send_p95_ms": self.send_latency.stats()["p95_ms"],
+            "delivery_p50_ms": self.delivery_latency.stats()["p50_ms"],
+            "delivery_p95_ms": self.delivery_latency.stats()["p95_ms"],
+        }
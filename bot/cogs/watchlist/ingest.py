@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+
+try:
+    import orjson
+
+    decode_json = orjson.loads
+except ImportError:  # orjson is optional, the stdlib parser is only slower
+    decode_json = json.loads
+
+TradeHandler = Callable[[dict], Awaitable[None]]
+TradeObserver = Callable[[dict], None]
+
+
+def put_drop_oldest(queue: asyncio.Queue, item) -> bool:
+    """Put without blocking; when the queue is full, evict the oldest item first. Returns True if one was dropped."""
+
+    dropped = False
+    if queue.full():
+        try:
+            queue.get_nowait()
+            dropped = True
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(item)
+    return dropped
+
+
+class TradeIngest:
+    """Staged pipeline between the Finnhub sockets and the DM fan-out.
+
+    ``submit`` is called from the receive loop and only enqueues the raw frame into a
+    bounded queue. A decoder task parses frames and keeps the latest trade per symbol;
+    every ``tick`` seconds the collapsed trades move to a second bounded queue served
+    by ``workers`` fan-out tasks. Both queues drop their oldest entry when full, so a
+    burst costs stale prices rather than unbounded memory or task counts. An optional
+    ``observer`` sees every decoded trade before collapsing, e.g. to build bars.
+    """
+
+    def __init__(
+            self,
+            handler: TradeHandler,
+            maxsize: int = 10000,
+            tick: float = 0.25,
+            workers: int = 4,
+            observer: Optional[TradeObserver] = None,
+            decode_batch: int = 256
+    ):
+        self.handler = handler
+        self.decode_batch = max(1, decode_batch)
+        self.observer = observer
+        self.tick = tick
+        self.worker_count = workers
+        self.raw: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.trades: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.pending: dict[str, dict] = {}  # symbol -> latest trade in the current tick window
+        self._tasks: list[asyncio.Task] = []
+
+        self.received = 0
+        self.dropped_raw = 0
+        self.decode_errors = 0
+        self.collapse_errors = 0
+        self.trades_in = 0
+        self.collapsed = 0
+        self.dropped_trades = 0
+        self.handled = 0
+        self.handler_errors = 0
+        self.max_raw_depth = 0
+        self.max_trade_depth = 0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._decode()),
+            asyncio.create_task(self._flush()),
+            *(asyncio.create_task(self._work()) for _ in range(self.worker_count)),
+        ]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def submit(self, message):
+        self.received += 1
+        if put_drop_oldest(self.raw, message):
+            self.dropped_raw += 1
+        self.max_raw_depth = max(self.max_raw_depth, self.raw.qsize())
+
+    def collapse(self, message) -> None:
+        try:
+            data = decode_json(message)
+        except ValueError:
+            self.decode_errors += 1
+            return
+
+        if not isinstance(data, dict):
+            self.decode_errors += 1
+            return
+        if data.get("type") != "trade":
+            return
+
+        trades = data.get("data", [])
+        if not isinstance(trades, list):
+            self.decode_errors += 1
+            return
+
+        observer = self.observer
+        for trade in trades:
+            # A malformed trade is skipped on its own; the rest of the frame still counts
+            try:
+                self.trades_in += 1
+                if observer is not None:
+                    observer(trade)
+                symbol = trade["s"]
+                current = self.pending.get(symbol)
+                if current is not None:
+                    self.collapsed += 1
+                    if current["t"] > trade["t"]:
+                        continue
+                self.pending[symbol] = trade
+            except (KeyError, TypeError):
+                self.decode_errors += 1
+
+    def collapse_safe(self, message):
+        """``collapse`` for the decoder task: one bad frame is counted and logged, never fatal."""
+
+        try:
+            self.collapse(message)
+        except Exception as e:
+            self.collapse_errors += 1
+            logging.error(f"[INGEST] Could not process frame: {e!r}")
+
+    async def _decode(self):
+        while True:
+            self.collapse_safe(await self.raw.get())
+            # Drain what else is queued in batches of ``decode_batch``, then yield, so a burst
+            # costs one short slice of the loop per batch instead of one long stall
+            for _ in range(self.decode_batch - 1):
+                if self.raw.empty():
+                    break
+                self.collapse_safe(self.raw.get_nowait())
+            await asyncio.sleep(0)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for trade in pending.values():
+            if put_drop_oldest(self.trades, trade):
+                self.dropped_trades += 1
+        self.max_trade_depth = max(self.max_trade_depth, self.trades.qsize())
+
+    async def _flush(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.flush()
+
+    async def _work(self):
+        while True:
+            trade = await self.trades.get()
+            try:
+                await self.handler(trade)
+                self.handled += 1
+            except Exception as e:
+                self.handler_errors += 1
+                logging.error(f"[INGEST] Handler failed for {trade.get('s')}: {e}")
+            finally:
+                self.trades.task_done()
+
+    async def drain(self):
+        """Wait until everything submitted so far has been handled (used by benchmarks)."""
+
+        while not self.raw.empty() or self.pending:
+            await asyncio.sleep(self.tick / 2)
+        await self.trades.join()
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "dropped_raw": self.dropped_raw,
+            "decode_errors": self.decode_errors,
+            "collapse_errors": self.collapse_errors,
+            "trades": self.trades_in,
+            "collapsed": self.collapsed,
+            "dropped_trades": self.dropped_trades,
+            "handled": self.handled,
+            "handler_errors": self.handler_errors,
+            "raw_depth": self.raw.qsize(),
+            "trade_depth": self.trades.qsize(),
+            "max_raw_depth": self.max_raw_depth,
+            "max_trade_depth": self.max_trade_depth,
+        }
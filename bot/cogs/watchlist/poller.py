@@ -0,0 +1,106 @@
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from bot.core.constant import TradeType
+from bot.core.market_data import MarketData
+from bot.core.quote_cache import QuoteKey
+
+QuoteHandler = Callable[[QuoteKey, dict], Awaitable[None]]
+
+# Seconds between polls of every watched symbol, for the types no websocket streams
+# (stocks come from Finnhub, crypto futures from BinanceTickerStream)
+POLL_INTERVALS = {
+    TradeType.CRYPTO.value: 30,
+    TradeType.FOREX.value: 30,
+    TradeType.INDICES_FUTURES.value: 30,
+}
+
+
+class QuotePoller:
+    """Polls watched symbols of the trade types without a stream on ``Bot.scheduler``.
+
+    Each trade type gets one interval job. A run takes the distinct symbols of that
+    type from the subscriber index and fetches them with a single
+    ``MarketData.fetch_batch`` call, so upstream cost follows the number of distinct
+    symbols rather than the number of watchers. Polls bypass the quote cache but
+    refresh it for /market. Every quote is handed to ``on_quote``, the same fan-out
+    path websocket trades use.
+    """
+
+    def __init__(
+            self,
+            market_data: MarketData,
+            keys: Callable[[], set[QuoteKey]],
+            on_quote: QuoteHandler,
+            intervals: Optional[dict[str, float]] = None
+    ):
+        self.market_data = market_data
+        self.keys = keys
+        self.on_quote = on_quote
+        self.intervals = intervals or POLL_INTERVALS
+        self.scheduler: Optional[AsyncIOScheduler] = None
+        self.counters: dict[str, dict] = {
+            trade_type: {"polls": 0, "symbols": 0, "quotes": 0, "errors": 0, "last_ms": 0.0}
+            for trade_type in self.intervals
+        }
+
+    @staticmethod
+    def job_id(trade_type: str) -> str:
+        return f"watchlist_poll_{trade_type.replace(' ', '_')}"
+
+    def start(self, scheduler: AsyncIOScheduler):
+        self.scheduler = scheduler
+        for trade_type, interval in self.intervals.items():
+            scheduler.add_job(
+                self.poll,
+                "interval",
+                args=[trade_type],
+                seconds=interval,
+                id=self.job_id(trade_type),
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+
+    def stop(self):
+        if self.scheduler is None:
+            return
+        for trade_type in self.intervals:
+            if self.scheduler.get_job(self.job_id(trade_type)) is not None:
+                self.scheduler.remove_job(self.job_id(trade_type))
+        self.scheduler = None
+
+    def symbols_for(self, trade_type: str) -> list[str]:
+        return sorted(symbol for key_type, symbol in self.keys() if key_type == trade_type)
+
+    async def poll(self, trade_type: str):
+        symbols = self.symbols_for(trade_type)
+        counters = self.counters[trade_type]
+        counters["symbols"] = len(symbols)
+        if not symbols:
+            return
+
+        started = time.perf_counter()
+        # Always upstream: with the crypto TTL equal to the interval, a cached read would halve the poll rate
+        quotes = await self.market_data.fetch_batch(trade_type, symbols, refresh=True)
+        counters["polls"] += 1
+        counters["last_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        for key, quote in quotes.items():
+            if "error" in quote or quote.get("current_price") is None:
+                counters["errors"] += 1
+                continue
+            counters["quotes"] += 1
+            try:
+                await self.on_quote(key, quote)
+            except Exception as e:
+                logging.error(f"[POLLER] Fan-out failed for {key}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            trade_type: ", ".join(f"{name}={value}" for name, value in counters.items())
+            for trade_type, counters in self.counters.items()
+        }
@@ -0,0 +1,153 @@
+import bisect
+import logging
+import math
+import time
+import zlib
+from typing import Callable
+
+from bot.cogs.watchlist.connection import ReconnectingSocket
+from bot.cogs.watchlist.subscriptions import SubscriptionManager
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes; adding a shard only moves about 1/K of the symbols."""
+
+    def __init__(self, shard_ids: list[int], vnodes: int = 64):
+        self.vnodes = vnodes
+        self._points: list[int] = []
+        self._owners: list[int] = []
+        for shard_id in shard_ids:
+            self.add(shard_id)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return zlib.crc32(value.encode())
+
+    def add(self, shard_id: int):
+        for vnode in range(self.vnodes):
+            point = self._hash(f"shard-{shard_id}-{vnode}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, shard_id)
+
+    def shard_for(self, symbol: str) -> int:
+        index = bisect.bisect(self._points, self._hash(symbol)) % len(self._points)
+        return self._owners[index]
+
+
+class FinnhubShard(ReconnectingSocket):
+    """One websocket connection serving the symbols the ring assigns to it.
+
+    Reconnects with jittered exponential backoff and keeps its own health counters.
+    """
+
+    def __init__(
+            self,
+            shard_id: int,
+            url: str,
+            desired: Callable[[], set[str]],
+            on_message: Callable[[str], None],
+            min_backoff: float = 1.0,
+            max_backoff: float = 60.0
+    ):
+        super().__init__(
+            url,
+            SubscriptionManager(desired=desired, name=f"finnhub shard {shard_id}"),
+            min_backoff=min_backoff,
+            max_backoff=max_backoff
+        )
+        self.shard_id = shard_id
+        self.log_name = f"[WEBSOCKET] Shard {shard_id}"
+        self.on_message = on_message
+
+        self.messages = 0
+        self.last_message_at = 0.0
+
+    async def receive(self, message):
+        self.messages += 1
+        self.last_message_at = time.monotonic()
+        self.on_message(message)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "symbols": len(self.subscriptions.active),
+            "messages": self.messages,
+            "idle_s": round(time.monotonic() - self.last_message_at, 1) if self.last_message_at else None,
+            "connects": self.connects,
+            "errors": self.errors,
+        }
+
+
+class ShardPool:
+    """Spreads watched symbols over K Finnhub connections by consistent hashing.
+
+    When the watched set outgrows ``max_symbols_per_shard * K`` a shard is added (up to
+    ``max_shards``); every shard then re-diffs its subscriptions, so only the symbols
+    the ring moved are unsubscribed on their old shard and subscribed on the new one.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            desired: Callable[[], set[str]],
+            on_message: Callable[[str], None],
+            shard_count: int = 1,
+            max_symbols_per_shard: int = 50,
+            max_shards: int = 8
+    ):
+        self.url = url
+        self.desired = desired
+        self.on_message = on_message
+        self.max_symbols_per_shard = max_symbols_per_shard
+        self.max_shards = max_shards
+        self.shards: dict[int, FinnhubShard] = {}
+        self.ring = HashRing([])
+        self.running = False
+        for _ in range(max(1, shard_count)):
+            self.add_shard()
+
+    def symbols_for(self, shard_id: int) -> set[str]:
+        return {symbol for symbol in self.desired() if self.ring.shard_for(symbol) == shard_id}
+
+    def add_shard(self) -> FinnhubShard:
+        shard_id = len(self.shards)
+        shard = FinnhubShard(
+            shard_id,
+            self.url,
+            desired=lambda: self.symbols_for(shard_id),
+            on_message=self.on_message
+        )
+        self.shards[shard_id] = shard
+        self.ring.add(shard_id)
+        if self.running:
+            shard.start()
+            # Every shard re-diffs, so symbols the ring moved leave their old shard
+            for other in self.shards.values():
+                other.subscriptions.request_sync()
+        logging.info(f"[WEBSOCKET] Shard pool now has {len(self.shards)} shards")
+        return shard
+
+    def ensure_capacity(self):
+        needed = min(self.max_shards, math.ceil(len(self.desired()) / self.max_symbols_per_shard))
+        while len(self.shards) < needed:
+            self.add_shard()
+
+    def start(self):
+        self.running = True
+        self.ensure_capacity()
+        for shard in self.shards.values():
+            shard.start()
+
+    def stop(self):
+        self.running = False
+        for shard in self.shards.values():
+            shard.stop()
+
+    def request_sync(self):
+        self.ensure_capacity()
+        for shard in self.shards.values():
+            shard.subscriptions.request_sync()
+
+    def stats(self) -> dict:
+        return {f"shard-{shard_id}": shard.stats() for shard_id, shard in self.shards.items()}
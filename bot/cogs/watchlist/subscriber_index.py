@@ -0,0 +1,319 @@
+import math
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+from bot.core.market_data import normalize_symbol
+from bot.core.quote_cache import QuoteKey
+
+# Called with (added keys, removed keys) whenever a key gains its first or loses its last subscriber
+IndexListener = Callable[[set[QuoteKey], set[QuoteKey]], None]
+
+DEFAULT_DELAY = 30
+DEFAULT_MAX_SILENCE = 3600  # seconds without a DM after which the price is sent even if it barely moved
+
+_EMPTY = array("q")
+
+
+def watch_key(entry: dict) -> QuoteKey:
+    trade_type = entry["type"].lower()
+    return trade_type, normalize_symbol(trade_type, entry["symbol"])
+
+
+def entry_threshold(entry: dict) -> tuple[float, bool]:
+    """(threshold, is_percent) stored on a watchlist entry by /watchlist_threshold."""
+
+    return float(entry.get("threshold", 0.0)), bool(entry.get("threshold_percent", False))
+
+
+def parse_threshold(text: str) -> tuple[float, bool]:
+    """``"2.5%"`` -> (2.5, True), ``"0.75"`` -> (0.75, False); raises ValueError on anything else."""
+
+    text = text.strip()
+    percent = text.endswith("%")
+    value = float(text.rstrip("%").strip())
+    # nan/inf would never be exceeded, silencing the symbol until max_silence
+    if not math.isfinite(value):
+        raise ValueError("threshold must be a finite number")
+    if value < 0:
+        raise ValueError("threshold must not be negative")
+    return value, percent
+
+
+def sorted_insert(values: array, value: int) -> int:
+    """Insert into a sorted array; returns the insert position, or -1 if the value was present."""
+
+    index = bisect_left(values, value)
+    if index < len(values) and values[index] == value:
+        return -1
+    values.insert(index, value)
+    return index
+
+
+def sorted_remove(values: array, value: int) -> int:
+    """Remove from a sorted array; returns the old position, or -1 if the value was absent."""
+
+    index = bisect_left(values, value)
+    if index == len(values) or values[index] != value:
+        return -1
+    del values[index]
+    return index
+
+
+class Subscribers:
+    """One key's subscribers as sorted user ids plus parallel per-pair columns.
+
+    Column ``i`` of ``last_sent``, ``last_price``, ``threshold`` and ``percent`` belongs
+    to ``users[i]``: a (user, symbol) pair's throttle slot is its position in the key's
+    arrays, so it is inserted and evicted together with the subscription and the
+    fan-out loop reads it without any hashing.
+    """
+
+    __slots__ = ("users", "last_sent", "last_price", "threshold", "percent")
+
+    def __init__(self):
+        self.users = array("q")
+        self.last_sent = array("d")
+        self.last_price = array("d")
+        self.threshold = array("d")  # minimum move before a DM; 0 means any change
+        self.percent = array("b")  # 1 when ``threshold`` is a percentage of the last sent price
+
+    def __len__(self):
+        return len(self.users)
+
+    def columns(self) -> tuple[array, ...]:
+        return self.last_sent, self.last_price, self.threshold, self.percent
+
+    def add(self, user_id: int):
+        index = sorted_insert(self.users, user_id)
+        if index >= 0:
+            for column in self.columns():
+                column.insert(index, 0)
+
+    def remove(self, user_id: int):
+        index = sorted_remove(self.users, user_id)
+        if index >= 0:
+            for column in self.columns():
+                del column[index]
+
+    def set_threshold(self, user_id: int, value: float, percent: bool):
+        index = bisect_left(self.users, user_id)
+        if index < len(self.users) and self.users[index] == user_id:
+            self.threshold[index] = value
+            self.percent[index] = percent
+
+    def rows(self) -> dict[int, tuple[float, float, float, int]]:
+        """user id -> (last_sent, last_price, threshold, percent)"""
+
+        return dict(zip(self.users, zip(*self.columns())))
+
+    @classmethod
+    def from_rows(cls, rows: dict[int, tuple[float, float, float, int]]) -> "Subscribers":
+        """Build the sorted arrays in one pass, for bulk loads."""
+
+        subscribers = cls()
+        ordered = sorted(rows.items())
+        subscribers.users = array("q", (user_id for user_id, _ in ordered))
+        for i, column in enumerate(subscribers.columns()):
+            column.extend(row[i] for _, row in ordered)
+        return subscribers
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.users, *self.columns()))
+
+
+class SubscriberIndex:
+    """Reverse index from (trade type, normalized symbol) to the users watching it.
+
+    Keys are interned to dense symbol ids; each key's subscribers and each user's
+    symbols are sorted ``array('q')`` values of integer ids, so a subscription costs
+    a few machine words including its throttle and threshold columns. Every mutation is a bisect on both
+    directions of the index, so it can be kept current from change-stream events or
+    write hooks instead of being rebuilt from the whole collection.
+    """
+
+    def __init__(self):
+        self.key_ids: dict[QuoteKey, int] = {}
+        self.id_keys: list[QuoteKey] = []
+        self.symbol_to_users: dict[int, Subscribers] = {}  # symbol id -> sorted user ids and throttle slots
+        self.user_to_symbols: dict[int, array] = {}  # user id -> sorted symbol ids
+        self.user_delays: dict[int, int] = {}
+        self.user_max_silence: dict[int, int] = {}
+        self.listeners: list[IndexListener] = []
+
+    def __len__(self):
+        return len(self.symbol_to_users)
+
+    def key_id(self, key: QuoteKey) -> int:
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            key_id = self.key_ids[key] = len(self.id_keys)
+            self.id_keys.append(key)
+        return key_id
+
+    def subscribers(self, key: QuoteKey) -> Optional[Subscribers]:
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            return None
+        return self.symbol_to_users.get(key_id)
+
+    def users_for(self, key: QuoteKey) -> array:
+        subscribers = self.subscribers(key)
+        return subscribers.users if subscribers is not None else _EMPTY
+
+    def symbols_for(self, user_id: int) -> set[QuoteKey]:
+        return {self.id_keys[key_id] for key_id in self.user_to_symbols.get(user_id, ())}
+
+    def keys(self) -> set[QuoteKey]:
+        return {self.id_keys[key_id] for key_id in self.symbol_to_users}
+
+    def subscriptions(self) -> int:
+        return sum(len(users) for users in self.symbol_to_users.values())
+
+    def _notify(self, added: set[QuoteKey], removed: set[QuoteKey]):
+        if not added and not removed:
+            return
+        for listener in self.listeners:
+            listener(added, removed)
+
+    def _add(self, user_id: int, key: QuoteKey) -> bool:
+        key_id = self.key_id(key)
+        users = self.symbol_to_users.get(key_id)
+        first = users is None
+        if first:
+            users = self.symbol_to_users[key_id] = Subscribers()
+        users.add(user_id)
+
+        symbols = self.user_to_symbols.get(user_id)
+        if symbols is None:
+            symbols = self.user_to_symbols[user_id] = array("q")
+        sorted_insert(symbols, key_id)
+        return first
+
+    def _remove(self, user_id: int, key: QuoteKey) -> bool:
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            return False
+        users = self.symbol_to_users.get(key_id)
+        if users is None:
+            return False
+        users.remove(user_id)
+
+        symbols = self.user_to_symbols.get(user_id)
+        if symbols is not None:
+            sorted_remove(symbols, key_id)
+            if not symbols:
+                del self.user_to_symbols[user_id]
+        if users:
+            return False
+        del self.symbol_to_users[key_id]
+        return True
+
+    def add(self, user_id: int, key: QuoteKey):
+        if self._add(user_id, key):
+            self._notify({key}, set())
+
+    def remove(self, user_id: int, key: QuoteKey):
+        if self._remove(user_id, key):
+            self._notify(set(), {key})
+
+    def set_delay(self, user_id: int, delay: int):
+        self.user_delays[user_id] = delay
+
+    def set_max_silence(self, user_id: int, max_silence: int):
+        self.user_max_silence[user_id] = max_silence
+
+    def set_threshold(self, user_id: int, key: QuoteKey, value: float, percent: bool):
+        subscribers = self.subscribers(key)
+        if subscribers is not None:
+            subscribers.set_threshold(user_id, value, percent)
+
+    def due_users(self, key: QuoteKey, now: float, price: float) -> list[int]:
+        """Users who should get ``price`` for ``key`` now; marks them as sent.
+
+        A pair is due once its delay has passed and the price moved more than its
+        threshold since the last DM, or once ``max_silence`` passed without any DM.
+        """
+
+        subscribers = self.subscribers(key)
+        if subscribers is None:
+            return []
+
+        due = []
+        delays = self.user_delays
+        silences = self.user_max_silence
+        last_sent = subscribers.last_sent
+        last_price = subscribers.last_price
+        threshold = subscribers.threshold
+        percent = subscribers.percent
+        for slot, user_id in enumerate(subscribers.users):
+            elapsed = now - last_sent[slot]
+            if elapsed < delays.get(user_id, DEFAULT_DELAY):
+                continue
+            previous = last_price[slot]
+            limit = threshold[slot] * previous / 100 if percent[slot] else threshold[slot]
+            if abs(price - previous) <= limit and elapsed < silences.get(user_id, DEFAULT_MAX_SILENCE):
+                continue
+            last_sent[slot] = now
+            last_price[slot] = price
+            due.append(user_id)
+        return due
+
+    def set_user(self, user_id: int, entries: Iterable[dict], delay: Optional[int] = None, max_silence: Optional[int] = None):
+        """Replace one user's watchlist entries, applying only the difference to the index."""
+
+        thresholds = {watch_key(entry): entry_threshold(entry) for entry in entries}
+        keys = set(thresholds)
+        current = self.symbols_for(user_id)
+        added = {key for key in keys - current if self._add(user_id, key)}
+        removed = {key for key in current - keys if self._remove(user_id, key)}
+        for key, (value, percent) in thresholds.items():
+            self.set_threshold(user_id, key, value, percent)
+        if delay is not None:
+            self.user_delays[user_id] = delay
+        if max_silence is not None:
+            self.user_max_silence[user_id] = max_silence
+        self._notify(added, removed)
+
+    def remove_user(self, user_id: int):
+        self.set_user(user_id, ())
+        self.user_delays.pop(user_id, None)
+        self.user_max_silence.pop(user_id, None)
+
+    def load(self, docs: Iterable[dict]):
+        """Bulk-load user documents without firing per-key notifications.
+
+        Rows are grouped per key and per user and sorted once each, so loading a key
+        with many watchers is O(n log n) rather than a bisect-insert per subscription.
+        """
+
+        before = self.keys()
+        key_rows: dict[int, dict[int, tuple[float, float, float, int]]] = {}
+        user_keys: dict[int, set[int]] = {}
+        for doc in docs:
+            user_id = int(doc["user_id"])
+            self.user_delays[user_id] = doc.get("delay", DEFAULT_DELAY)
+            self.user_max_silence[user_id] = doc.get("max_silence", DEFAULT_MAX_SILENCE)
+            for entry in doc.get("watchlist", []):
+                key_id = self.key_id(watch_key(entry))
+                rows = key_rows.get(key_id)
+                if rows is None:
+                    subscribers = self.symbol_to_users.get(key_id)
+                    rows = key_rows[key_id] = subscribers.rows() if subscribers is not None else {}
+                value, percent = entry_threshold(entry)
+                last_sent, last_price, _, _ = rows.get(user_id, (0.0, 0.0, 0.0, 0))
+                rows[user_id] = (last_sent, last_price, value, percent)
+                user_keys.setdefault(user_id, set()).add(key_id)
+
+        for key_id, rows in key_rows.items():
+            self.symbol_to_users[key_id] = Subscribers.from_rows(rows)
+        for user_id, key_ids in user_keys.items():
+            key_ids.update(self.user_to_symbols.get(user_id, ()))
+            self.user_to_symbols[user_id] = array("q", sorted(key_ids))
+        self._notify(self.keys() - before, set())
+
+    def nbytes(self) -> int:
+        """Payload bytes of the id arrays and throttle slots (excludes dict and object overhead)."""
+
+        users = sum(symbols.itemsize * len(symbols) for symbols in self.user_to_symbols.values())
+        return users + sum(subscribers.nbytes() for subscribers in self.symbol_to_users.values())
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Optional
+
+# Turns ("subscribe" | "unsubscribe", symbols) into the frames to send
+FrameEncoder = Callable[[str, list[str]], list[str]]
+
+
+def subscription_frame(action: str, symbol: str) -> str:
+    return json.dumps({"type": action, "symbol": symbol}, separators=(",", ":"))
+
+
+def finnhub_frames(action: str, symbols: list[str]) -> list[str]:
+    """Finnhub takes one symbol per frame."""
+
+    return [subscription_frame(action, symbol) for symbol in symbols]
+
+
+class SubscriptionManager:
+    """Keeps a websocket's subscriptions equal to the set of symbols someone watches.
+
+    ``request_sync`` is cheap and may be called on every index change; the sync task
+    waits ``batch_delay`` to collect a burst of changes, diffs the desired set against
+    what the socket has active, and sends all subscribe/unsubscribe frames back to
+    back. ``attach`` on a fresh connection starts from an empty active set, so the
+    full desired set is replayed after every reconnect. ``encode`` decides how the
+    symbols are framed, so venues that accept a list per frame send fewer messages.
+    """
+
+    def __init__(
+            self,
+            desired: Callable[[], set[str]],
+            batch_delay: float = 0.25,
+            name: str = "finnhub",
+            encode: FrameEncoder = finnhub_frames
+    ):
+        self.desired = desired
+        self.batch_delay = batch_delay
+        self.name = name
+        self.encode = encode
+        self.active: set[str] = set()
+        self.websocket = None
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.frames_sent = 0
+        self.subscribes = 0
+        self.unsubscribes = 0
+        self.syncs = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def attach(self, websocket):
+        self.websocket = websocket
+        self.active.clear()
+        self.request_sync()
+
+    def detach(self, websocket=None):
+        if websocket is None or websocket is self.websocket:
+            self.websocket = None
+            self.active.clear()
+
+    def request_sync(self):
+        self._dirty.set()
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(self.batch_delay)
+            self._dirty.clear()
+            try:
+                await self.sync()
+            except Exception as e:
+                # The socket went away mid-sync; attach() replays everything on the next connection
+                logging.warning(f"[SUBSCRIPTIONS] {self.name} sync failed: {e}")
+
+    async def sync(self):
+        websocket = self.websocket
+        if websocket is None:
+            return
+
+        desired = self.desired()
+        to_add = desired - self.active
+        to_remove = self.active - desired
+        if not to_add and not to_remove:
+            return
+
+        if to_remove:
+            for frame in self.encode("unsubscribe", sorted(to_remove)):
+                await websocket.send(frame)
+                self.frames_sent += 1
+            self.active -= to_remove
+            self.unsubscribes += len(to_remove)
+        if to_add:
+            for frame in self.encode("subscribe", sorted(to_add)):
+                await websocket.send(frame)
+                self.frames_sent += 1
+            self.active |= to_add
+            self.subscribes += len(to_add)
+
+        self.syncs += 1
+        logging.info(f"[SUBSCRIPTIONS] {self.name}: +{len(to_add)} -{len(to_remove)}, {len(self.active)} active")
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self.active),
+            "connected": self.websocket is not None,
+            "subscribes": self.subscribes,
+            "unsubscribes": self.unsubscribes,
+            "frames": self.frames_sent,
+            "syncs": self.syncs,
+        }
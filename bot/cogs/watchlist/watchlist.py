@@ -1,14 +1,37 @@
 import asyncio
-import json
+import logging
 import time
-from collections import defaultdict
+from typing import Optional
 
-import websockets
 from discord.ext import commands
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure, PyMongoError
 
-from bot import FINNHUB_KEY
-from bot.core.constant import DbConstant
+from bot import (
+    DM_GLOBAL_RATE,
+    DM_WORKERS,
+    FINNHUB_KEY,
+    FINNHUB_MAX_SHARDS,
+    FINNHUB_SHARDS,
+    FINNHUB_SYMBOLS_PER_SHARD,
+    INGEST_QUEUE_SIZE,
+    INGEST_TICK,
+    INGEST_WORKERS
+)
+from bot.cogs.watchlist.alerts import ABOVE, Alert, AlertEngine
+from bot.cogs.watchlist.binance_stream import BinanceTickerStream
+from bot.cogs.watchlist.dm_dispatcher import DmDispatcher
+from bot.cogs.watchlist.ingest import TradeIngest
+from bot.cogs.watchlist.poller import QuotePoller
+from bot.cogs.watchlist.shards import ShardPool
+from bot.cogs.watchlist.subscriber_index import DEFAULT_DELAY, DEFAULT_MAX_SILENCE, SubscriberIndex, watch_key
+from bot.core.constant import DbConstant, TradeType
+from bot.core.quote_cache import QuoteKey
+
+USER_PROJECTION = {"user_id": 1, "delay": 1, "max_silence": 1, "watchlist": 1}
+# Server error codes: $changeStream on a standalone server, and a resume point no longer in the oplog
+CHANGE_STREAM_UNSUPPORTED = 40573
+CHANGE_STREAM_HISTORY_LOST = {280, 286}
 
 
 class Watchlist(commands.Cog):
@@ -17,97 +40,306 @@ class Watchlist(commands.Cog):
         self.user_collection: AsyncIOMotorCollection = self.bot.db[DbConstant.USER_COLLECTION.value]
         self.api_key = FINNHUB_KEY
         self.ws_url = f"wss://ws.finnhub.io?token={self.api_key}"
-        # self.bot.loop.create_task(self.start_websockets())
 
+        self.index = SubscriberIndex()
+        self.doc_users = {}  # Mongo _id -> user_id, so delete events can be mapped back to a user
+        self.change_stream_active = False
+        self.dispatcher = DmDispatcher(self.bot, workers=DM_WORKERS, global_rate=DM_GLOBAL_RATE)
+        self.ingest = TradeIngest(
+            self.handle_trade,
+            maxsize=INGEST_QUEUE_SIZE,
+            tick=INGEST_TICK,
+            workers=INGEST_WORKERS,
+            observer=self.record_trade
+        )
+        self.shards = ShardPool(
+            self.ws_url,
+            desired=self.finnhub_symbols,
+            on_message=self.ingest.submit,
+            shard_count=FINNHUB_SHARDS,
+            max_symbols_per_shard=FINNHUB_SYMBOLS_PER_SHARD,
+            max_shards=FINNHUB_MAX_SHARDS
+        )
+        self.futures_stream = BinanceTickerStream(
+            self.bot.futures_snapshot,
+            desired=self.futures_symbols,
+            on_ticker=self.handle_futures_ticker
+        )
+        self.alerts = AlertEngine(self.bot.db[DbConstant.ALERT_COLLECTION.value])
+        self.poller = QuotePoller(self.bot.market_data, keys=self.watched_keys, on_quote=self.handle_quote)
+        self.index.listeners.append(self.on_index_change)
+        self.alerts.book.listeners.append(self.on_index_change)
+        self.tasks: list[asyncio.Task] = []
 
-        self.symbol_to_users = {}  # Mapping from symbol to list of user_ids
-        self.symbols_subscribed = set()
-        self.user_delays = {}
-        self.last_sent = defaultdict(lambda: defaultdict(lambda: 0))  # user_id -> symbol -> last_sent_timestamp
-        # self.bot.loop.create_task(self.periodic_user_data_refresh())
+    async def cog_load(self):
+        self.dispatcher.start()
+        self.ingest.start()
+        self.shards.start()
+        self.futures_stream.start()
+        self.poller.start(self.bot.scheduler)
+        self.alerts.start(self.bot.scheduler)
+        self.tasks = [
+            asyncio.create_task(self.start_index()),
+            asyncio.create_task(self.alerts.load_with_retry()),
+        ]
 
-    async def periodic_user_data_refresh(self, interval=60):
-        await self.bot.wait_until_ready()
-        while True:
-            await self.update_symbol_to_users()
-            await asyncio.sleep(interval)
+    async def cog_unload(self):
+        self.alerts.stop(self.bot.scheduler)
+        await self.alerts.flush()
+        self.poller.stop()
+        self.futures_stream.stop()
+        self.shards.stop()
+        self.ingest.stop()
+        self.dispatcher.stop()
+        for task in self.tasks:
+            task.cancel()
 
+    async def start_index(self, min_backoff: float = 1.0, max_backoff: float = 60.0):
+        """Build the subscriber index once, then keep it current from the change stream.
 
-    async def start_websockets(self):
-        await  self.bot.wait_until_ready()
+        The scan is retried with backoff, so Mongo being unreachable at boot delays the
+        watchlists instead of leaving them empty until a restart.
+        """
 
-        async for websocket in websockets.connect(self.ws_url):
+        backoff = min_backoff
+        while True:
+            # Captured before the scan so the stream replays writes other clients make while it runs
+            start_at = await self.operation_time()
             try:
-                print("[WEBSOCKET] CONNECTED")
-                await self.update_symbol_to_users()
-                await self.subscribe_symbols(websocket)
+                await self.build_index()
+                break
+            except PyMongoError as e:
+                logging.error(f"[WATCHLIST] Could not build the index, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(max_backoff, backoff * 2)
+        await self.watch_user_changes(start_at)
 
-                async for message in websocket:
-                    print("[DEBUG] Raw message:", message)
-                    data = json.loads(message)
-                    asyncio.create_task(self.handle_data(data))  # Don't block main loop
-            except Exception as e:
-                print(f"[WEBSOCKET ERROR] {e}. Reconnecting in 5s...")
-                await asyncio.sleep(5)
+    async def operation_time(self):
+        """The deployment's current operation time, or None where there is none (standalone servers)."""
 
+        try:
+            reply = await self.user_collection.database.command("ping")
+        except PyMongoError as e:
+            logging.warning(f"[WATCHLIST] Could not read the operation time: {e}")
+            return None
+        return reply.get("operationTime")
 
-    async def update_symbol_to_users(self):
-        """Fetch all users and their watchlist from DB"""
+    async def build_index(self):
+        """Load every user's watchlist with a projection-only scan"""
 
-        self.symbol_to_users.clear()
+        docs = []
+        async for doc in self.user_collection.find({}, projection=USER_PROJECTION):
+            self.doc_users[doc["_id"]] = int(doc["user_id"])
+            docs.append(doc)
+        self.index.load(docs)
+        logging.info(f"[WATCHLIST] Index built: {len(docs)} users, {len(self.index)} symbols")
 
-        cursor = self.user_collection.find({})
+    async def resync_index(self):
+        """Re-apply every user document as a diff and drop users that are gone, after the stream lost history."""
 
-        async for doc in cursor:
-            user_id = str(doc["user_id"])
-            delay = doc.get("delay", 30)
-            self.user_delays[user_id] = delay
-            for item in doc.get("watchlist", []):
-                symbol = item["symbol"]
-                if symbol not in self.symbol_to_users:
-                    self.symbol_to_users[symbol] = []
-                self.symbol_to_users[symbol].append(user_id)
+        seen = set()
+        async for doc in self.user_collection.find({}, projection=USER_PROJECTION):
+            self.apply_doc(doc["_id"], doc)
+            seen.add(int(doc["user_id"]))
+        for user_id in set(self.index.user_to_symbols) - seen:
+            self.index.remove_user(user_id)
+        self.doc_users = {doc_id: user_id for doc_id, user_id in self.doc_users.items() if user_id in seen}
+        logging.info(f"[WATCHLIST] Index resynced: {len(seen)} users, {len(self.index)} symbols")
 
-    async def subscribe_symbols(self, websocket):
-        """Subscribe to all symbols in all watchlist"""
+    async def watch_user_changes(self, start_at=None, min_backoff: float = 1.0, max_backoff: float = 60.0):
+        """Follow the change stream, reopening it after transient errors from the last resume token."""
 
-        for symbol in self.symbol_to_users:
-            if symbol not in self.symbols_subscribed:
-                await websocket.send(json.dumps({"type": "subscribe", "symbol": symbol}, indent=4))
-                self.symbols_subscribed.add(symbol)
+        resume_token = None
+        backoff = min_backoff
+        while True:
+            if resume_token is not None:
+                options = {"resume_after": resume_token}
+            elif start_at is not None:
+                options = {"start_at_operation_time": start_at}
+            else:
+                options = {}
+            try:
+                async with self.user_collection.watch(full_document="updateLookup", **options) as stream:
+                    self.change_stream_active = True
+                    backoff = min_backoff
+                    logging.info("[WATCHLIST] Following user_collection change stream")
+                    async for change in stream:
+                        self.apply_change(change)
+                        resume_token = stream.resume_token
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_UNSUPPORTED:
+                    # Standalone servers have no change streams; the write hooks below keep the index current instead
+                    logging.warning(f"[WATCHLIST] Change stream unavailable, using write hooks: {e}")
+                    return
+                if e.code in CHANGE_STREAM_HISTORY_LOST:
+                    # The oplog moved past our position; start over from now and rescan what was missed
+                    logging.warning(f"[WATCHLIST] Change stream history lost, resyncing the index: {e}")
+                    resume_token = None
+                    start_at = await self.operation_time()
+                    try:
+                        await self.resync_index()
+                    except PyMongoError as scan_error:
+                        logging.error(f"[WATCHLIST] Index resync failed: {scan_error}")
+                else:
+                    logging.warning(f"[WATCHLIST] Change stream failed, reopening in {backoff:.0f}s: {e}")
+            except PyMongoError as e:
+                logging.warning(f"[WATCHLIST] Change stream interrupted, reopening in {backoff:.0f}s: {e}")
+            finally:
+                self.change_stream_active = False
 
+            await asyncio.sleep(backoff)
+            backoff = min(max_backoff, backoff * 2)
 
+    def apply_change(self, change: dict):
+        doc_id = change["documentKey"]["_id"]
 
+        if change["operationType"] == "delete":
+            user_id = self.doc_users.pop(doc_id, None)
+            if user_id is not None:
+                self.index.remove_user(user_id)
+            return
 
-    async def handle_data(self, data: dict):
-        """handle incoming price updates and DM relevant users"""
+        doc = change.get("fullDocument")
+        if doc:
+            self.apply_doc(doc_id, doc)
 
-        if data.get("type") != "trade":
+    def apply_doc(self, doc_id, doc: dict):
+        if "user_id" not in doc:
             return
 
-        for trade  in data.get("data",[]):
-            symbol = trade["s"]
-            price = trade['p']
-            timestamp = trade['t']
-            volume = trade['v']
+        user_id = int(doc["user_id"])
+        self.doc_users[doc_id] = user_id
+        self.index.set_user(
+            user_id,
+            doc.get("watchlist", []),
+            delay=doc.get("delay", DEFAULT_DELAY),
+            max_silence=doc.get("max_silence", DEFAULT_MAX_SILENCE)
+        )
+
+    @commands.Cog.listener()
+    async def on_watchlist_item_added(self, user_id: int, symbol: str, trade_type: str):
+        self.dispatcher.allow(int(user_id))
+        self.index.add(int(user_id), watch_key({"symbol": symbol, "type": trade_type}))
+
+    @commands.Cog.listener()
+    async def on_watchlist_item_removed(self, user_id: int, symbol: str, trade_type: str):
+        self.index.remove(int(user_id), watch_key({"symbol": symbol, "type": trade_type}))
+
+    @commands.Cog.listener()
+    async def on_watchlist_delay_updated(self, user_id: int, delay: int):
+        self.dispatcher.allow(int(user_id))
+        self.index.set_delay(int(user_id), delay)
+
+    @commands.Cog.listener()
+    async def on_watchlist_threshold_updated(
+            self,
+            user_id: int,
+            symbol: str,
+            trade_type: str,
+            threshold: float,
+            percent: bool,
+            max_silence: Optional[int]
+    ):
+        self.dispatcher.allow(int(user_id))
+        key = watch_key({"symbol": symbol, "type": trade_type})
+        self.index.set_threshold(int(user_id), key, threshold, percent)
+        if max_silence is not None:
+            self.index.set_max_silence(int(user_id), max_silence)
+
+    @commands.Cog.listener()
+    async def on_price_alert_added(self, doc: dict):
+        self.dispatcher.allow(int(doc["user_id"]))
+        self.alerts.book.add(Alert.from_doc(doc))
+
+    @commands.Cog.listener()
+    async def on_price_alert_removed(self, alert_id):
+        self.alerts.book.remove(alert_id)
+
+    def watched_keys(self) -> set[QuoteKey]:
+        """Keys that need live prices: anything on a watchlist or with an active alert."""
+
+        return self.index.keys() | self.alerts.book.keys()
+
+    def is_watched(self, key: QuoteKey) -> bool:
+        return bool(self.index.users_for(key)) or key in self.alerts.book.books
+
+    def symbols_of(self, trade_type: TradeType) -> set[str]:
+        return {symbol for key_type, symbol in self.watched_keys() if key_type == trade_type.value}
+
+    def finnhub_symbols(self) -> set[str]:
+        return self.symbols_of(TradeType.STOCK)
+
+    def futures_symbols(self) -> set[str]:
+        return self.symbols_of(TradeType.CRYPTO_FUTURES)
+
+    def stats(self) -> dict:
+        return {
+            "index": {
+                "symbols": len(self.index),
+                "users": len(self.index.user_to_symbols),
+                "subscriptions": self.index.subscriptions(),
+                "change_stream": self.change_stream_active,
+            },
+            "ingest": self.ingest.stats(),
+            "polling": self.poller.stats(),
+            "binance": self.futures_stream.stats(),
+            "alerts": self.alerts.stats(),
+            **self.shards.stats(),
+        }
+
+    def on_index_change(self, added: set, removed: set):
+        # A key leaving the watchlists may still carry alerts, and the other way round
+        removed = {key for key in removed if not self.is_watched(key)}
+        changed_types = {trade_type for trade_type, _ in added | removed}
+        if TradeType.STOCK.value in changed_types:
+            self.shards.request_sync()
+            for trade_type, symbol in removed:
+                if trade_type == TradeType.STOCK.value:
+                    self.bot.trade_bars.discard(symbol)
+        if TradeType.CRYPTO_FUTURES.value in changed_types:
+            self.futures_stream.request_sync()
+
+    def record_trade(self, trade: dict):
+        """Roll every Finnhub trade, before collapsing, into the in-memory OHLCV bars and check its alerts.
+
+        Alerts are checked here rather than on the collapsed trade, so a spike through a
+        threshold that reverses within one ingest tick still fires.
+        """
+
+        self.bot.trade_bars.add_trade(trade["s"], trade["p"], trade.get("v") or 0.0, trade["t"])
+        self.fire_alerts((TradeType.STOCK.value, trade["s"]), trade["p"])
+
+    async def handle_trade(self, trade: dict):
+        """Fan out the latest collapsed Finnhub trade for a stock symbol (its alerts were checked per trade)"""
+
+        await self.handle_price((TradeType.STOCK.value, trade["s"]), trade["p"], check_alerts=False)
+
+    async def handle_futures_ticker(self, symbol: str, price: float):
+        """Fan out a Binance ticker event for a crypto-futures symbol"""
+
+        await self.handle_price((TradeType.CRYPTO_FUTURES.value, symbol), price)
 
-            user_ids = self.symbol_to_users.get(symbol,[])
+    async def handle_quote(self, key: QuoteKey, quote: dict):
+        """Fan out a polled quote for the trade types Finnhub does not stream"""
 
-            now = time.time()
+        await self.handle_price(key, quote["current_price"])
 
-            for user_id in user_ids:
-                delay = self.user_delays.get(user_id, 30)
-                last_sent_time = self.last_sent[user_id][symbol]
+    async def handle_price(self, key: QuoteKey, price: float, check_alerts: bool = True):
+        """Queue a price for every user whose delay and move threshold it passes, and fire crossed alerts"""
 
-                if now - last_sent_time >= delay:
-                    self.last_sent[user_id][symbol] = now
-                    user = self.bot.get_user(int(user_id))
-                    if user:
-                        try:
-                            await user.send(f"📈 {symbol} price updated: **${price}**")
-                        except Exception as e:
-                            print(f"[DM Error] {user_id}: {e}")
+        now = time.time()
+        for user_id in self.index.due_users(key, now, price):
+            self.dispatcher.enqueue(user_id, key[1], price)
+        if check_alerts:
+            self.fire_alerts(key, price)
 
+    def fire_alerts(self, key: QuoteKey, price: float):
+        for alert in self.alerts.check(key, price):
+            crossed = "rose above" if alert.direction == ABOVE else "fell below"
+            self.dispatcher.notify(
+                alert.user_id,
+                f"🔔 **{key[1]}** {crossed} ${alert.price:g} (now **${price}**)"
+            )
 
 
 # import aiohttp
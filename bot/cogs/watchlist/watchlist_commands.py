@@ -1,15 +1,15 @@
 import datetime
 import logging
+import re
+from typing import Optional
 
 import discord
 from discord.ext import commands
 from motor.motor_asyncio import AsyncIOMotorCollection
 
-from bot.api.crypto_api import get_crypto_price
-from bot.api.future_crypto_api import future_crypto_api
-from bot.api.index_futures_api import get_index_futures_data
-from bot.api.stock_api import get_stock_price
+from bot.cogs.watchlist.subscriber_index import parse_threshold
 from bot.core.ModalsSchema import ModalFieldsSchema
+from bot.core.ai import generate_watchlist_brief
 from bot.core.constant import DbConstant, TradeType, type_list
 from bot.core.embed_builder import generic_embed
 from bot.core.modals import GenericModal
@@ -46,8 +46,61 @@ class WatchlistCommands(commands.Cog):
         )
 
         if update.modified_count > 0 or update.upserted_id is not None:
+            self.bot.dispatch("watchlist_delay_updated", ctx.author.id, delay)
             await ctx.send(f"{delay} seconds sets for watchlist update for dms.")
 
+    @commands.hybrid_command(name="watchlist_threshold",
+                             description="Only DM a watchlist price when it moves by this much (e.g. 0.5 or 2%)")
+    async def watchlist_threshold(
+            self,
+            ctx: commands.Context,
+            symbol: str,
+            type: str,
+            change: str,
+            max_silence: Optional[int] = None
+    ):
+        if type.lower() not in type_list:
+            await ctx.send(f"`{type}` is an invalid watchlist type. Available types are - `{", ".join(type_list)}`",
+                           ephemeral=True)
+            return
+
+        try:
+            threshold, percent = parse_threshold(change)
+        except ValueError:
+            await ctx.send("Please provide a valid change. Ex - `0.5` for an absolute move or `2%` for a percent move",
+                           ephemeral=True)
+            return
+
+        if max_silence is not None and max_silence < 0:
+            await ctx.send("Please provide a valid max silence in seconds. Ex - `600, 3600`", ephemeral=True)
+            return
+
+        update_fields = {"watchlist.$.threshold": threshold, "watchlist.$.threshold_percent": percent}
+        if max_silence is not None:
+            update_fields["max_silence"] = max_silence
+
+        update = await self.user_collection.update_one(
+            {
+                "user_id": ctx.author.id,
+                "watchlist": {
+                    "$elemMatch": {
+                        "symbol": {"$regex": f"^{re.escape(symbol)}$", "$options": "i"},
+                        "type": type.lower()
+                    }
+                }
+            },
+            {"$set": update_fields}
+        )
+
+        if update.matched_count == 0:
+            await ctx.send(f"❌ Could not find `{symbol}` of type `{type}` in your watchlist.", ephemeral=True)
+            return
+
+        self.bot.dispatch("watchlist_threshold_updated", ctx.author.id, symbol, type, threshold, percent, max_silence)
+        move = f"{threshold}%" if percent else f"{threshold}"
+        silence = f" or every {max_silence} seconds" if max_silence is not None else ""
+        await ctx.send(f"`{symbol}` DMs will be sent on moves over {move}{silence}.")
+
     @commands.hybrid_command(name="watchlist_add", description="The item you want to add your watchlist")
     async def add_watchlist(self, ctx: commands.Context):
 
@@ -141,6 +194,7 @@ class WatchlistCommands(commands.Cog):
             )
 
             if update.modified_count > 0 or update.upserted_id is not None:
+                self.bot.dispatch("watchlist_item_added", interaction.user.id, symbol, trade_type)
                 await interaction.followup.send(embed=embed)
 
         except Exception as e:
@@ -222,51 +276,28 @@ class WatchlistCommands(commands.Cog):
                 return
 
             all_fields = []
+            quotes = await self.bot.market_data.fetch_quotes(filtered)
 
-            for entry in filtered:
+            for entry, data in zip(filtered, quotes):
                 symbol = entry["symbol"]
                 type_ = entry["type"].lower()
 
                 try:
-                    if type_ == TradeType.STOCK.value:
-                        stock_api_data = await get_stock_price(symbol.upper())
-
-                        if "error" in stock_api_data:
-                            continue
+                    if "error" in data:
+                        continue
 
-                        name = stock_api_data.get("symbol")
-                        value = f">>> 💵 Price {stock_api_data.get("current_price", "N/A")}\n📊 Change: `{stock_api_data.get("percent_change")}%`"
+                    if type_ == TradeType.STOCK.value:
+                        name = data.get("symbol")
+                        value = f">>> 💵 Price {data.get("current_price", "N/A")}\n📊 Change: `{data.get("percent_change")}%`"
                     elif type_ == TradeType.CRYPTO.value:
-                        symbol = symbol.split("/")
-                        crypto_id, currency = symbol
-                        crypto_data = await get_crypto_price(crypto_id=crypto_id, currency=currency)
-                        if "error" in crypto_data:
-                            continue
-                        name = crypto_data.get("name")
-                        value = f">>> 💵 Price {crypto_data.get("current_price", "N/A")}\n📊 Change: `{crypto_data.get("percent_change")}%` \n📈 Volume: {crypto_data.get("total_volume", "N/A")}"
-
+                        name = data.get("name")
+                        value = f">>> 💵 Price {data.get("current_price", "N/A")}\n📊 Change: `{data.get("percent_change")}%` \n📈 Volume: {data.get("total_volume", "N/A")}"
                     elif type_ == TradeType.CRYPTO_FUTURES.value:
-                        crypto_future_data = await future_crypto_api(symbol)
-                        if "error" in crypto_future_data:
-                            continue
-                        name = crypto_future_data.get("symbol", 'N/A')
-                        value = f">>> 💵 Price {crypto_future_data.get("current_price", "N/A")}\n📊 Change: `{crypto_future_data.get("percent_change")}%` \n📈 Volume: {crypto_future_data.get("volume", "N/A")}"
-
-                    elif type_ == TradeType.INDICES_FUTURES.value:
-                        index_data = await get_index_futures_data(symbol= f"{symbol}=F")
-                        if "error" in index_data:
-                            continue
-                        name = index_data.get("symbol")
-                        value = f">>> 💵 Price {index_data.get("current_price", "N/A")}\n📊 Change: `{index_data.get("percent_change")}%` \n📈 Volume: {index_data.get("volume", "N/A")}"
-
-                    elif type_ == TradeType.FOREX.value:
-                        symbol = symbol.split("/")
-                        asset, currency = symbol
-                        forex_data = await get_index_futures_data(symbol=f"{asset}{currency}=X")
-                        if "error" in forex_data:
-                            continue
-                        name = forex_data.get("symbol")
-                        value = f">>> 💵 Price {forex_data.get("current_price", "N/A")}\n📊 Change: `{forex_data.get("percent_change")}%` \n📈 Volume: {forex_data.get("volume", "N/A")}"
+                        name = data.get("symbol", 'N/A')
+                        value = f">>> 💵 Price {data.get("current_price", "N/A")}\n📊 Change: `{data.get("percent_change")}%` \n📈 Volume: {data.get("volume", "N/A")}"
+                    elif type_ in (TradeType.INDICES_FUTURES.value, TradeType.FOREX.value):
+                        name = data.get("symbol")
+                        value = f">>> 💵 Price {data.get("current_price", "N/A")}\n📊 Change: `{data.get("percent_change")}%` \n📈 Volume: {data.get("volume", "N/A")}"
                     else:
                         continue
 
@@ -427,6 +458,34 @@ class WatchlistCommands(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="watchlist_brief", description="Get one AI briefing covering your whole watchlist")
+    async def watchlist_brief(self, ctx: commands.Context):
+        await ctx.defer()
+        user_doc = await self.user_collection.find_one({"user_id": ctx.author.id})
+
+        if not user_doc or not user_doc.get("watchlist"):
+            await ctx.send(f"❌ You don't have any items in your watchlist")
+            return
+
+        watchlist = user_doc["watchlist"]
+        quotes = await self.bot.market_data.fetch_quotes(watchlist)
+        rows = [
+            (entry["type"].lower(), quote)
+            for entry, quote in zip(watchlist, quotes)
+            if "error" not in quote
+        ]
+        if not rows:
+            await ctx.send("❌ Could not fetch market data for your watchlist right now. Please try again later.")
+            return
+
+        brief = await generate_watchlist_brief(rows)
+        embed = generic_embed(
+            title=f"🧠 {ctx.author.name}'s Watchlist Brief",
+            description=(brief or "⚠️ Could not generate AI insight at the moment. Please try again later.")[:4096],
+            timestamp=datetime.datetime.now()
+        )
+        await ctx.send(embed=embed)
+
     @commands.hybrid_command(name="watchlist_remove", description="Remove an item from your watchlist")
     async def watchlist_remove(self, ctx: commands.Context, symbol: str, type: str):
         await ctx.defer()
@@ -443,6 +502,7 @@ class WatchlistCommands(commands.Cog):
         )
 
         if update_result.modified_count > 0:
+            self.bot.dispatch("watchlist_item_removed", user_id, symbol, type)
             embed = generic_embed(
                 title="Watchlist Item Removed",
                 description=f"Successfully removed `{symbol}` of type `{type}` from your watchlist.",
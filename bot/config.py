@@ -1,12 +1,26 @@
 import discord
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from discord.ext import commands
+from bot.api.http_client import HttpClient
+from bot.api.index_futures_api import YF_EXECUTOR
+from bot.core.bars import BarAggregator
+from bot.core.ai import close_ai_client
 from bot.core.constant import DbConstant
-from bot import MONGO_CLIENT
+from bot.core.futures_snapshot import FuturesSnapshot
+from bot.core.indicators import IndicatorService
+from bot.core.loop_monitor import LoopLagMonitor
+from bot.core.market_data import MarketData
+from bot.core.prewarm import PrewarmService
+from bot.core.quote_cache import QuoteCache
+from bot import (
+    MONGO_CLIENT, HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_PER_HOST,
+    PREWARM_INTERVAL, PREWARM_TOP_N, PREWARM_AI_BUDGET
+)
 
 extensions = [
     "bot.cogs.watchlist",
-    "bot.cogs.market"
+    "bot.cogs.market",
+    "bot.cogs.stats"
 ]
 
 class Bot(commands.Bot):
@@ -15,6 +29,45 @@ class Bot(commands.Bot):
         self.mongo_client = MONGO_CLIENT
         self.db = self.mongo_client[DbConstant.DATABASE_NAME.value]
         self.scheduler  = AsyncIOScheduler()
+        self.http_client = HttpClient(
+            timeout=HTTP_TIMEOUT,
+            connect_timeout=HTTP_CONNECT_TIMEOUT,
+            max_connections=HTTP_MAX_CONNECTIONS,
+            per_host_limit=HTTP_MAX_PER_HOST
+        )
+        self.futures_snapshot = FuturesSnapshot(http_client=self.http_client)
+        self.market_data = MarketData(
+            http_client=self.http_client,
+            cache=QuoteCache(),
+            futures_snapshot=self.futures_snapshot
+        )
+        self.trade_bars = BarAggregator()
+        self.indicators = IndicatorService(http_client=self.http_client, trade_bars=self.trade_bars)
+        self.prewarm = PrewarmService(
+            user_collection=self.db[DbConstant.USER_COLLECTION.value],
+            market_data=self.market_data,
+            indicators=self.indicators,
+            interval=PREWARM_INTERVAL,
+            top_n=PREWARM_TOP_N,
+            ai_budget=PREWARM_AI_BUDGET
+        )
+        self.loop_monitor = LoopLagMonitor()
+
+    async def setup_hook(self):
+        await self.http_client.start()
+        self.loop_monitor.start()
+        self.futures_snapshot.start(self.scheduler)
+        self.prewarm.start(self.scheduler)
+        self.scheduler.start()
+
+    async def close(self):
+        self.loop_monitor.stop()
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        await super().close()
+        await self.http_client.close()
+        await close_ai_client()
+        YF_EXECUTOR.shutdown(wait=False, cancel_futures=True)
 
     async def on_ready(self):
         for extension  in extensions:
@@ -1,68 +1,434 @@
 import asyncio
 import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
 
 from bot import GITHUB_AI_TOKEN
+from bot.core.ai_scheduler import AiOverloaded, AiScheduler, Priority
 
-api_sema = asyncio.Semaphore(3)
+ai_scheduler = AiScheduler()
+
+# Longest an interactive request may queue before we answer with market data only
+INTERACTIVE_MAX_WAIT = 20.0
+BACKGROUND_MAX_WAIT = 5.0
 
 endpoint = "https://models.github.ai/inference"
 model = "openai/gpt-4.1"
 
-
-async def generate_ai_response(
-        prompt: str
-):
-    async with api_sema:
-        try:
-            client = OpenAI(
-                base_url=endpoint,
-                api_key=GITHUB_AI_TOKEN,
-            )
-            messages = [
-                {
-                    "role": "system", "content": """
+SYSTEM_PROMPT = """
 You are a professional financial analyst with expertise in cryptocurrency, stocks, forex, and options trading. 
 
 You provide sharp, concise, and insightful commentary based on market data. Focus on trends, momentum, volatility, volume, and technical levels. Avoid disclaimers, filler words, and repeating the input. Your tone is confident, analytical, and to-the-point. Output should sound like a trader's opinion, not a report.
 
 📝 Format Requirement: After every sentence, add a blank line for better readability.
 """
-                },
-                {
-                    "role": "user", "content": prompt
-                }
-            ]
 
-            response = client.chat.completions.create(
+_ai_client: Optional[AsyncOpenAI] = None
+
+
+def get_ai_client() -> AsyncOpenAI:
+    """Shared async client; its pooled httpx transport keeps connections to the endpoint warm."""
+
+    global _ai_client
+    if _ai_client is None:
+        _ai_client = AsyncOpenAI(
+            base_url=endpoint,
+            api_key=GITHUB_AI_TOKEN,
+            # 429s are retried by ai_scheduler, which also adapts concurrency to them
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60.0),
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+        )
+    return _ai_client
+
+
+async def close_ai_client():
+    global _ai_client
+    if _ai_client is not None:
+        await _ai_client.close()
+        _ai_client = None
+
+
+def build_messages(prompt: str) -> list[dict]:
+    return [
+        {
+            "role": "system", "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user", "content": prompt
+        }
+    ]
+
+
+async def generate_ai_response(
+        prompt: str,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = INTERACTIVE_MAX_WAIT,
+        require_complete: bool = False
+):
+    """Completion text, or None on failure; with ``require_complete`` also None when it was cut off at the token limit."""
+
+    try:
+        client = get_ai_client()
+        messages = build_messages(prompt)
+
+        response = await ai_scheduler.call(
+            lambda: client.chat.completions.create(
                 messages=messages,
                 temperature=1.0,
                 top_p=1.0,
                 model=model
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            logging.error(f"[OPENAI ERROR] - Error Generating AI Response: {e}")
+            ),
+            priority=priority,
+            max_wait=max_wait
+        )
+        choice = response.choices[0]
+        if require_complete and choice.finish_reason == "length":
+            logging.warning("[OPENAI] Completion truncated at the token limit, discarding it")
             return None
+        return choice.message.content
+    except AiOverloaded as e:
+        logging.warning(f"[OPENAI] Request shed: {e}")
+        return None
+    except Exception as e:
+        logging.error(f"[OPENAI ERROR] - Error Generating AI Response: {e}")
+        return None
+
+
+class StreamStatus:
+    """Filled in by ``stream_ai_response``; ``complete`` is only set when the model finished normally."""
+
+    __slots__ = ("complete",)
+
+    def __init__(self):
+        self.complete = False
 
 
+async def stream_ai_response(
+        prompt: str,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = INTERACTIVE_MAX_WAIT,
+        status: Optional[StreamStatus] = None
+) -> AsyncIterator[str]:
+    """Yield completion text as it arrives. Errors are logged and end the stream early.
 
+    An early end looks like a normal one to the caller, so callers that keep the
+    text pass a ``status`` and check ``status.complete`` afterwards.
+    """
+
+    chunks: asyncio.Queue[Optional[str]] = asyncio.Queue()
+    started = False
+    finish_reason = None
 
-async def generate_market_ai_response(live_data: dict):
+    async def consume():
+        nonlocal started, finish_reason
+        client = get_ai_client()
+        stream = await client.chat.completions.create(
+            messages=build_messages(prompt),
+            temperature=1.0,
+            top_p=1.0,
+            model=model,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if chunk.choices[0].delta.content:
+                    started = True
+                    chunks.put_nowait(chunk.choices[0].delta.content)
+        except Exception as e:
+            if started:
+                # Never retry once text reached the caller, it would be duplicated
+                raise RuntimeError(str(e)) from e
+            raise
 
-    USER_PROMPT = f"""
+    async def run():
+        try:
+            # The slot is held for the whole stream, so concurrency counts open streams
+            await ai_scheduler.call(consume, priority=priority, max_wait=max_wait)
+            if status is not None:
+                status.complete = finish_reason != "length"
+        except AiOverloaded as e:
+            logging.warning(f"[OPENAI] Stream shed: {e}")
+        except Exception as e:
+            if started:
+                logging.error(f"[OPENAI ERROR] - Stream interrupted: {e}")
+            else:
+                logging.error(f"[OPENAI ERROR] - Error Streaming AI Response: {e}")
+        finally:
+            chunks.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while (text := await chunks.get()) is not None:
+            yield text
+    finally:
+        task.cancel()
+
+
+def build_market_prompt(live_data: dict) -> str:
+    return f"""
     Give an opinion on the crypto market for symbol {live_data.get("symbol")} based on this data:
     {live_data}
     Focus on trend, momentum, and any key levels. Avoid repeating data. No disclaimers. No greetings. Just an insight.
     """
+
+
+InsightKey = tuple[str, int, int]
+
+
+class InsightCache:
+    """AI insights keyed on a quantized market state rather than the exact quote.
+
+    Prices are bucketed on a log scale of ``price_bucket_pct`` and the percent change
+    is rounded to ``change_step``, so quotes that barely moved share one completion.
+    Entries are fresh for ``ttl`` seconds and are then served stale (while a single
+    background refresh runs) until ``stale_ttl``. The cache is capped both by entry
+    count and by total text size, evicting least recently used entries first.
+    """
+
+    def __init__(
+            self,
+            ttl: float = 120,
+            stale_ttl: float = 900,
+            max_entries: int = 2000,
+            max_bytes: int = 4_000_000,
+            price_bucket_pct: float = 0.25,
+            change_step: float = 0.5
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._log_step = math.log1p(price_bucket_pct / 100)
+        self.change_step = change_step
+        self._entries: OrderedDict[InsightKey, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self._refreshing: dict[InsightKey, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def key(self, live_data: dict) -> InsightKey:
+        price = float(live_data.get("current_price") or 0)
+        change = float(live_data.get("percent_change") or 0)
+        price_bucket = round(math.log(price) / self._log_step) if price > 0 else 0
+        return str(live_data.get("symbol", "")).upper(), price_bucket, round(change / self.change_step)
+
+    def is_fresh(self, live_data: dict) -> bool:
+        """Whether a fresh insight exists for this state, without touching stats or LRU order."""
+
+        entry = self._entries.get(self.key(live_data))
+        return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def lookup(self, live_data: dict) -> Optional[str]:
+        """Cached insight for this market state, scheduling a background refresh if it is stale."""
+
+        key = self.key(live_data)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        created_at, text = entry
+        age = time.monotonic() - created_at
+        if age > self.stale_ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if age > self.ttl:
+            self.stale_hits += 1
+            self._refresh(key, live_data)
+        else:
+            self.hits += 1
+        return text
+
+    def store(self, live_data: dict, text: str):
+        key = self.key(live_data)
+        self._remove(key)
+        self._entries[key] = (time.monotonic(), text)
+        self._bytes += len(text.encode())
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: InsightKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1].encode())
+
+    def _refresh(self, key: InsightKey, live_data: dict):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                text = await generate_ai_response(
+                    prompt=build_market_prompt(live_data),
+                    priority=Priority.BACKGROUND,
+                    max_wait=BACKGROUND_MAX_WAIT,
+                    require_complete=True
+                )
+                if text:
+                    self.store(live_data, text)
+                    self.refreshes += 1
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "entries": len(self._entries),
+            "kb": round(self._bytes / 1024, 1),
+        }
+
+
+insight_cache = InsightCache()
+
+
+async def stream_market_ai_response(live_data: dict) -> AsyncIterator[str]:
+    cached = insight_cache.lookup(live_data)
+    if cached is not None:
+        yield cached
+        return
+
+    insight = ""
+    status = StreamStatus()
+    async for text in stream_ai_response(prompt=build_market_prompt(live_data), status=status):
+        insight += text
+        yield text
+    # An interrupted reply is shown once but never cached as the full insight
+    if insight and status.complete:
+        insight_cache.store(live_data, insight)
+
+
+async def generate_market_ai_response(
+        live_data: dict,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = INTERACTIVE_MAX_WAIT
+):
+
+    cached = insight_cache.lookup(live_data)
+    if cached is not None:
+        return cached
+    return await refresh_market_insight(live_data, priority=priority, max_wait=max_wait)
+
+
+async def refresh_market_insight(
+        live_data: dict,
+        priority: Priority = Priority.BACKGROUND,
+        max_wait: Optional[float] = BACKGROUND_MAX_WAIT
+) -> Optional[str]:
+    """Generate and cache a fresh insight without a cache lookup, so pre-warming leaves the hit/miss stats alone."""
+
+    USER_PROMPT = build_market_prompt(live_data)
     try:
-        response = await generate_ai_response(prompt=USER_PROMPT)
+        response = await generate_ai_response(
+            prompt=USER_PROMPT,
+            priority=priority,
+            max_wait=max_wait,
+            require_complete=True
+        )
+        if response:
+            insight_cache.store(live_data, response)
         return response
     except Exception as e:
         logging.error(f"Error generating market response :{e}")
         return None
 
+# Rough BPE estimate: words, up-to-3-digit number chunks and single symbols each count as one token
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+BRIEF_TOKEN_BUDGET = 1500
+
+brief_token_stats = {"briefs": 0, "compact_tokens": 0, "dict_repr_tokens": 0}
+
+
+def count_tokens(text: str) -> int:
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _compact_number(value, abbreviate: bool = False) -> str:
+    if not isinstance(value, (int, float)):
+        return "-"
+    if not abbreviate:
+        return f"{value:.6g}"
+    for divisor, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= divisor * 10:
+            return f"{value / divisor:.1f}{suffix}"
+    return f"{value:.6g}"
+
+
+def build_watchlist_brief_prompt(quotes: list[tuple[str, dict]], token_budget: int = BRIEF_TOKEN_BUDGET) -> tuple[str, int]:
+    """Pack ``(trade_type, quote)`` pairs into one pipe-separated table within ``token_budget``.
+
+    Returns the prompt and how many rows fit.
+    """
+
+    header = f"""
+    Give a short opinion on each symbol of this watchlist based on the table below.
+    Columns: symbol|type|price|chg%|volume
+    Answer with one section per symbol in table order, formatted as **SYMBOL** followed by one or two sentences on trend, momentum and key levels.
+    Avoid repeating data. No disclaimers. No greetings.
+    """
+    lines = [header.rstrip(), "symbol|type|price|chg%|volume"]
+    used = count_tokens("\n".join(lines))
+    rows = 0
+    for trade_type, quote in quotes:
+        volume = quote.get("volume", quote.get("total_volume"))
+        line = "|".join((
+            str(quote.get("symbol", "N/A")).upper(),
+            trade_type,
+            _compact_number(quote.get("current_price")),
+            _compact_number(quote.get("percent_change")),
+            _compact_number(volume, abbreviate=True),
+        ))
+        line_tokens = count_tokens(line)
+        if used + line_tokens > token_budget:
+            break
+        lines.append(line)
+        used += line_tokens
+        rows += 1
+    return "\n".join(lines), rows
+
+
+async def generate_watchlist_brief(quotes: list[tuple[str, dict]]) -> Optional[str]:
+    """One completion commenting on every quote, instead of one completion per symbol."""
+
+    prompt, rows = build_watchlist_brief_prompt(quotes)
+
+    compact_tokens = count_tokens(SYSTEM_PROMPT) + count_tokens(prompt)
+    dict_repr_tokens = sum(count_tokens(SYSTEM_PROMPT) + count_tokens(build_market_prompt(quote)) for _, quote in quotes[:rows])
+    brief_token_stats["briefs"] += 1
+    brief_token_stats["compact_tokens"] += compact_tokens
+    brief_token_stats["dict_repr_tokens"] += dict_repr_tokens
+    logging.info(
+        f"[AI BRIEF] {rows}/{len(quotes)} symbols in ~{compact_tokens} prompt tokens "
+        f"(~{dict_repr_tokens} with per-symbol dict prompts, {dict_repr_tokens - compact_tokens} saved)"
+    )
+
+    return await generate_ai_response(prompt=prompt)
+
+
 live_datas = {'symbol': 'AAPL', 'current_price': 219.31, 'change': 6.06, 'percent_change': 2.84, 'day_high': 220.34,
              'day_low': 216.58, 'day_open': 218.8, 'last_close': 213.25, 'timestamp': 1754586786}
 #
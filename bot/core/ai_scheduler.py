@@ -0,0 +1,215 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class AiOverloaded(Exception):
+    """Raised instead of queueing when a request could not start within its ``max_wait``."""
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the endpoint asked us to wait, read from the 429 response headers if present."""
+
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(str(value).rstrip("s")))
+        except ValueError:
+            continue
+    return None
+
+
+class AiScheduler:
+    """Priority queue in front of the AI endpoint with an adaptive concurrency limit.
+
+    Interactive requests always start before background ones. The limit grows by one
+    while latency stays under ``target_latency`` and the limit is saturated, shrinks by
+    one when latency runs over, and halves on a 429, which also pauses dispatch for the
+    endpoint's retry-after (or a jittered exponential backoff). A request whose
+    projected queue wait exceeds its ``max_wait`` is rejected with ``AiOverloaded``
+    up front so callers can fall back to a data-only answer.
+    """
+
+    def __init__(
+            self,
+            initial_concurrency: int = 3,
+            min_concurrency: int = 1,
+            max_concurrency: int = 8,
+            target_latency: float = 10.0,
+            max_retries: int = 3,
+            base_backoff: float = 1.0,
+            max_backoff: float = 30.0
+    ):
+        self.limit = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.latency_ewma = target_latency / 2
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._cooldown_until = 0.0
+        self._successes_since_increase = 0
+
+        self.completed = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.shed = 0
+
+    def projected_wait(self, priority: Priority) -> float:
+        ahead = sum(1 for waiter_priority, _, future in self._waiters if waiter_priority <= priority and not future.done())
+        cooldown = max(0.0, self._cooldown_until - time.monotonic())
+        slots_needed = ahead + self._active - self.limit + 1
+        if slots_needed <= 0:
+            return cooldown
+        return cooldown + math.ceil(slots_needed / self.limit) * self.latency_ewma
+
+    def _can_start(self) -> bool:
+        return self._active < self.limit and time.monotonic() >= self._cooldown_until
+
+    def _dispatch(self):
+        while self._waiters and self._can_start():
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(None)
+
+        cooldown = self._cooldown_until - time.monotonic()
+        if self._waiters and cooldown > 0:
+            asyncio.get_running_loop().call_later(cooldown, self._dispatch)
+
+    async def _acquire(self, priority: Priority, max_wait: Optional[float]):
+        if max_wait is not None and self.projected_wait(priority) > max_wait:
+            self.shed += 1
+            raise AiOverloaded(f"projected wait {self.projected_wait(priority):.1f}s exceeds {max_wait:.1f}s")
+
+        if not self._waiters and self._can_start():
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=max_wait)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                future.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self.shed += 1
+                raise AiOverloaded(f"waited more than {max_wait:.1f}s for a slot") from None
+            raise
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _record_success(self, latency: float):
+        self.completed += 1
+        self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+
+        if self.latency_ewma > self.target_latency:
+            self.limit = max(self.min_concurrency, self.limit - 1)
+            self._successes_since_increase = 0
+            return
+
+        self._successes_since_increase += 1
+        if self._active >= self.limit and self._successes_since_increase >= self.limit:
+            self.limit = min(self.max_concurrency, self.limit + 1)
+            self._successes_since_increase = 0
+
+    def _record_rate_limit(self, error: Exception, attempt: int) -> float:
+        self.rate_limited += 1
+        self.limit = max(self.min_concurrency, self.limit // 2)
+        self._successes_since_increase = 0
+
+        delay = retry_after(error)
+        if delay is None:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        delay *= random.uniform(0.8, 1.3)
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+        logging.warning(f"[AI SCHEDULER] Rate limited, concurrency now {self.limit}, backing off {delay:.1f}s")
+        return delay
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE, max_wait: Optional[float] = None):
+        await self._acquire(priority, max_wait)
+        started = time.monotonic()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if not failed:
+                self._record_success(time.monotonic() - started)
+            self._release()
+
+    async def call(
+            self,
+            request: Callable[[], Awaitable[T]],
+            priority: Priority = Priority.INTERACTIVE,
+            max_wait: Optional[float] = None
+    ) -> T:
+        """Run ``request`` in a slot, retrying 429s with jittered backoff until ``max_retries``."""
+
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        attempt = 0
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                async with self.slot(priority, remaining):
+                    return await request()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._record_rate_limit(e, attempt)
+
+            if deadline is not None and time.monotonic() + delay > deadline:
+                self.shed += 1
+                raise AiOverloaded("rate limited past the request deadline")
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "queued": sum(1 for *_, future in self._waiters if not future.done()),
+            "latency_ewma_ms": round(self.latency_ewma * 1000),
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "shed": self.shed,
+        }
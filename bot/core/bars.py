@@ -0,0 +1,185 @@
+import time
+from array import array
+from typing import Optional
+
+# Bar width in seconds -> bars kept per symbol (2 minutes of 1s, a regular session of 1m, a day of 5m)
+BAR_INTERVALS = {1: 120, 60: 390, 300: 288}
+DAY_SECONDS = 86400
+
+
+class BarRing:
+    """Fixed-size ring of OHLCV bars of one width, stored column-wise in typed arrays.
+
+    All columns are preallocated, so a trade only overwrites numbers in place. Trades
+    for the current bar update it; a newer bar advances the head (bars with no
+    trades in between are simply absent); trades older than the current bar are
+    counted as late and ignored.
+    """
+
+    __slots__ = ("width", "capacity", "head", "size", "late",
+                 "start", "open", "high", "low", "close", "volume")
+
+    def __init__(self, width: int, capacity: int):
+        self.width = width
+        self.capacity = capacity
+        self.head = -1
+        self.size = 0
+        self.late = 0
+        self.start = array("q", bytes(8 * capacity))
+        self.open = array("d", bytes(8 * capacity))
+        self.high = array("d", bytes(8 * capacity))
+        self.low = array("d", bytes(8 * capacity))
+        self.close = array("d", bytes(8 * capacity))
+        self.volume = array("d", bytes(8 * capacity))
+
+    def add(self, seconds: int, price: float, volume: float):
+        bucket = seconds - seconds % self.width
+        head = self.head
+        if head >= 0 and bucket == self.start[head]:
+            if price > self.high[head]:
+                self.high[head] = price
+            elif price < self.low[head]:
+                self.low[head] = price
+            self.close[head] = price
+            self.volume[head] += volume
+            return
+        if head >= 0 and bucket < self.start[head]:
+            self.late += 1
+            return
+
+        head = self.head = (head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        self.start[head] = bucket
+        self.open[head] = self.high[head] = self.low[head] = self.close[head] = price
+        self.volume[head] = volume
+
+    def latest(self, count: Optional[int] = None) -> list[tuple[int, float, float, float, float, float]]:
+        """Up to ``count`` most recent bars, oldest first, as (start, open, high, low, close, volume)."""
+
+        count = self.size if count is None else min(count, self.size)
+        slots = [(self.head - offset) % self.capacity for offset in range(count - 1, -1, -1)]
+        return [
+            (self.start[i], self.open[i], self.high[i], self.low[i], self.close[i], self.volume[i])
+            for i in slots
+        ]
+
+    def nbytes(self) -> int:
+        columns = (self.start, self.open, self.high, self.low, self.close, self.volume)
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+class SymbolBars:
+    """Every bar width for one symbol plus a running UTC-day summary.
+
+    The summary only covers the whole day when streaming already ran before the day
+    started (``day_complete``); after a restart or a mid-day watch it starts at
+    ``day_since``, the first trade seen.
+    """
+
+    __slots__ = ("rings", "day", "day_since", "day_complete", "day_open", "day_high", "day_low", "day_volume",
+                 "day_pv", "last_price", "trades")
+
+    def __init__(self, intervals: dict[int, int]):
+        self.rings = [BarRing(width, capacity) for width, capacity in intervals.items()]
+        self.day = -1
+        self.day_since = 0
+        self.day_complete = False
+        self.day_open = self.day_high = self.day_low = 0.0
+        self.day_volume = self.day_pv = 0.0
+        self.last_price = 0.0
+        self.trades = 0
+
+    def add(self, seconds: int, price: float, volume: float):
+        day = seconds // DAY_SECONDS
+        if day != self.day:
+            if day < self.day:
+                return  # a trade from a previous session
+            # Only a rollover seen while streaming means every trade of the new day is counted
+            self.day_complete = self.day != -1
+            self.day = day
+            self.day_since = seconds
+            self.day_open = self.day_high = self.day_low = price
+            self.day_volume = self.day_pv = 0.0
+        elif price > self.day_high:
+            self.day_high = price
+        elif price < self.day_low:
+            self.day_low = price
+        self.day_volume += volume
+        self.day_pv += price * volume
+        self.last_price = price
+        self.trades += 1
+
+        for ring in self.rings:
+            ring.add(seconds, price, volume)
+
+    def nbytes(self) -> int:
+        return sum(ring.nbytes() for ring in self.rings)
+
+
+class BarAggregator:
+    """Rolls the trade stream into 1s/1m/5m OHLCV bars and day stats per symbol.
+
+    ``add_trade`` is called for every trade before the ingest pipeline collapses
+    them, so /market and AI prompts can read day high/low, VWAP and volume from
+    memory instead of a REST round trip.
+    """
+
+    def __init__(self, intervals: Optional[dict[int, int]] = None):
+        self.intervals = intervals or BAR_INTERVALS
+        self.symbols: dict[str, SymbolBars] = {}
+        self.bytes_per_symbol = SymbolBars(self.intervals).nbytes()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def add_trade(self, symbol: str, price: float, volume: float, timestamp_ms: int):
+        bars = self.symbols.get(symbol)
+        if bars is None:
+            bars = self.symbols[symbol] = SymbolBars(self.intervals)
+        bars.add(timestamp_ms // 1000, price, volume)
+
+    def discard(self, symbol: str):
+        self.symbols.pop(symbol, None)
+
+    def bars(self, symbol: str, width: int, count: Optional[int] = None) -> list[tuple]:
+        symbol_bars = self.symbols.get(symbol)
+        if symbol_bars is None:
+            return []
+        for ring in symbol_bars.rings:
+            if ring.width == width:
+                return ring.latest(count)
+        raise ValueError(f"No {width}s bars are kept")
+
+    def day_stats(self, symbol: str) -> dict:
+        """Day open/high/low, VWAP and volume for ``symbol``, or {} when no trade was seen.
+
+        When the summary does not cover the whole day, only ``stream_vwap``,
+        ``stream_volume`` and ``stream_since`` (UTC) are returned, so a partial window
+        is never presented as day figures.
+        """
+
+        bars = self.symbols.get(symbol)
+        if bars is None or not bars.trades:
+            return {}
+        vwap = round(bars.day_pv / bars.day_volume, 4) if bars.day_volume else bars.last_price
+        if not bars.day_complete:
+            return {
+                "stream_vwap": vwap,
+                "stream_volume": bars.day_volume,
+                "stream_since": time.strftime("%H:%M UTC", time.gmtime(bars.day_since)),
+            }
+        return {
+            "day_open": bars.day_open,
+            "day_high": bars.day_high,
+            "day_low": bars.day_low,
+            "vwap": vwap,
+            "day_volume": bars.day_volume,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self.symbols),
+            "trades": sum(bars.trades for bars in self.symbols.values()),
+            "bytes_per_symbol": self.bytes_per_symbol,
+        }
@@ -9,6 +9,7 @@ class DbConstant(Enum):
     Collection Enums
     """
     USER_COLLECTION ="user_collection"
+    ALERT_COLLECTION = "alert_collection"
 
 
 class TradeType(Enum):
@@ -0,0 +1,103 @@
+import datetime
+import logging
+import time
+from typing import NamedTuple, Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from bot.api.future_crypto_api import future_crypto_tickers
+from bot.api.http_client import HttpClient
+
+
+class FuturesTicker(NamedTuple):
+    symbol: str
+    current_price: float
+    percent_change: float
+    volume: float
+
+    def as_quote(self) -> dict:
+        return self._asdict()
+
+
+class FuturesSnapshot:
+    """In-memory table of every Binance perpetual's 24hr ticker.
+
+    A scheduler job refreshes the whole table with one request; lookups are O(1)
+    dict reads, so crypto-futures quotes cost no upstream call while the table is
+    younger than ``max_age``. Tickers pushed by the websocket stream through
+    ``update`` are kept per symbol and win over the REST table while they are fresh.
+    """
+
+    def __init__(self, http_client: HttpClient, interval: float = 5, max_age: float = 30):
+        self.http_client = http_client
+        self.interval = interval
+        self.max_age = max_age
+        self.tickers: dict[str, FuturesTicker] = {}
+        self.live: dict[str, tuple[float, FuturesTicker]] = {}  # symbol -> (monotonic receive time, ticker)
+        self.updated_at = 0.0
+        self.refreshes = 0
+        self.failures = 0
+
+    def start(self, scheduler: AsyncIOScheduler):
+        scheduler.add_job(
+            self.refresh,
+            "interval",
+            seconds=self.interval,
+            id="futures_snapshot_refresh",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.datetime.now(datetime.timezone.utc)
+        )
+
+    async def refresh(self):
+        try:
+            tickers = await future_crypto_tickers(self.http_client)
+        except Exception as e:
+            self.failures += 1
+            logging.error(f"[FUTURES SNAPSHOT] Refresh failed: {e}")
+            return
+
+        self.tickers = {
+            ticker["symbol"]: FuturesTicker(
+                ticker["symbol"], ticker["current_price"], ticker["percent_change"], ticker["volume"]
+            )
+            for ticker in tickers
+        }
+        self.updated_at = time.monotonic()
+        self.refreshes += 1
+
+    def update(self, ticker: FuturesTicker) -> Optional[FuturesTicker]:
+        """Store a streamed ticker; returns the previous live ticker for the symbol, if any."""
+
+        previous = self.live.get(ticker.symbol)
+        self.live[ticker.symbol] = (time.monotonic(), ticker)
+        return previous[1] if previous else None
+
+    def discard(self, symbol: str):
+        self.live.pop(symbol, None)
+
+    @property
+    def is_fresh(self) -> bool:
+        return bool(self.tickers) and time.monotonic() - self.updated_at <= self.max_age
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """Quote for ``symbol`` from the stream or the table, or None when it is unknown or stale."""
+
+        live = self.live.get(symbol)
+        if live is not None and time.monotonic() - live[0] <= self.max_age:
+            return live[1].as_quote()
+        if not self.is_fresh:
+            return None
+        ticker = self.tickers.get(symbol)
+        return ticker.as_quote() if ticker else None
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self.tickers),
+            "live": len(self.live),
+            "age_s": round(time.monotonic() - self.updated_at, 1) if self.updated_at else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
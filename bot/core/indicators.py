@@ -0,0 +1,314 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from bot.api.crypto_api import get_crypto_ohlc
+from bot.api.future_crypto_api import future_crypto_klines
+from bot.api.http_client import HttpClient
+from bot.api.index_futures_api import get_history
+from bot.core.bars import BarAggregator
+from bot.core.constant import TradeType
+from bot.core.market_data import normalize_symbol
+
+Candles = dict[str, np.ndarray]  # time (epoch seconds), open, high, low, close, volume
+IndicatorKey = tuple[str, str, str]  # (TradeType value, normalized symbol, interval)
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+MIN_BARS = 30
+PIVOT_WINDOW = 5  # bars on each side a swing high/low must dominate
+LEVEL_LOOKBACK = 250
+
+# Seconds an indicator snapshot stays fresh, per candle interval
+INDICATOR_TTLS = {"1d": 600, "4h": 600, "1m-local": 30}
+INTERVAL_SECONDS = {"1d": 86_400, "4h": 14_400}
+# Longest an AI prompt waits for the indicator snapshot before going out without it
+SNAPSHOT_TIMEOUT = 5.0
+
+
+def ema(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponential moving average ``y[t] = a * x[t] + (1 - a) * y[t - 1]`` seeded with ``x[0]``.
+
+    Uses the closed form ``y[k] = d^k * (y[0] + a * cumsum(x[j] / d^j))`` with
+    ``d = 1 - a``, evaluated in blocks short enough that ``d^-k`` stays finite, so the
+    whole series is a handful of vector operations instead of a Python loop.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if not len(values):
+        return out
+
+    decay = 1.0 - alpha
+    block = max(1, int(300 / -np.log(decay))) if decay > 0 else len(values)
+    previous = out[0] = values[0]
+    start = 1
+    while start < len(values):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        smoothed = powers * (previous + alpha * np.cumsum(chunk / powers))
+        out[start:start + len(chunk)] = smoothed
+        previous = smoothed[-1]
+        start += len(chunk)
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI; one value per bar after the first."""
+
+    delta = np.diff(close)
+    average_gain = ema(np.clip(delta, 0, None), 1 / period)
+    average_loss = ema(np.clip(-delta, 0, None), 1 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = average_gain / average_loss
+    return np.where(average_loss == 0, 100.0, 100 - 100 / (1 + strength))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    previous_close = close[:-1]
+    true_range = np.maximum.reduce([
+        high[1:] - low[1:],
+        np.abs(high[1:] - previous_close),
+        np.abs(low[1:] - previous_close),
+    ])
+    return ema(true_range, 1 / period)
+
+
+def pivot_levels(high: np.ndarray, low: np.ndarray, price: float, window: int = PIVOT_WINDOW) -> tuple[float, float]:
+    """Nearest swing low below and swing high above ``price``, falling back to the range extremes."""
+
+    if len(high) <= 2 * window:
+        return float(low.min()), float(high.max())
+
+    centre = slice(window, len(high) - window)
+    swing_highs = high[centre][sliding_window_view(high, 2 * window + 1).max(axis=1) == high[centre]]
+    swing_lows = low[centre][sliding_window_view(low, 2 * window + 1).min(axis=1) == low[centre]]
+
+    above = swing_highs[swing_highs > price]
+    below = swing_lows[swing_lows < price]
+    resistance = above.min() if above.size else high.max()
+    support = below.max() if below.size else low.min()
+    return float(support), float(resistance)
+
+
+def _number(value: float) -> float:
+    return float(f"{value:.6g}")
+
+
+def compute_indicators(candles: Candles, fast: int = 12, slow: int = 26, period: int = 14) -> dict:
+    """RSI, EMA crossover, ATR and support/resistance for the latest bar, or {} with too little history."""
+
+    close = candles["close"]
+    if len(close) < MIN_BARS:
+        return {}
+    high, low = candles["high"], candles["low"]
+    price = float(close[-1])
+
+    fast_ema = ema(close, 2 / (fast + 1))
+    slow_ema = ema(close, 2 / (slow + 1))
+    side = np.sign(fast_ema - slow_ema)
+    crosses = np.flatnonzero(side[1:] != side[:-1])
+    average_range = float(atr(high, low, close, period)[-1])
+    support, resistance = pivot_levels(high[-LEVEL_LOOKBACK:], low[-LEVEL_LOOKBACK:], price)
+
+    return {
+        "bars": len(close),
+        f"rsi_{period}": round(float(rsi(close, period)[-1]), 1),
+        f"ema_{fast}": _number(fast_ema[-1]),
+        f"ema_{slow}": _number(slow_ema[-1]),
+        "ema_trend": "bullish" if side[-1] > 0 else "bearish",
+        "bars_since_cross": int(len(close) - 2 - crosses[-1]) if crosses.size else None,
+        f"atr_{period}": _number(average_range),
+        "atr_pct": round(average_range / price * 100, 2) if price else None,
+        "support": _number(support),
+        "resistance": _number(resistance),
+    }
+
+
+def candles_from_rows(rows: list, time_scale: int = 1) -> Candles:
+    """Columns from ``[time, open, high, low, close(, volume)]`` rows; ``time_scale`` converts ms to s."""
+
+    table = np.asarray([row[:6] for row in rows], dtype=np.float64)
+    if table.shape[1] == 5:
+        table = np.column_stack([table, np.zeros(len(table))])
+    columns = {name: table[:, i] for i, name in enumerate(COLUMNS)}
+    columns["time"] = (columns["time"] // time_scale).astype(np.int64)
+    return columns
+
+
+def merge_candles(old: Optional[Candles], new: Candles, max_bars: int) -> Candles:
+    """Append ``new`` to ``old``, replacing bars from the first new timestamp on (the last bar is usually still forming)."""
+
+    if old is None or not len(old["time"]):
+        return {name: column[-max_bars:] for name, column in new.items()}
+    keep = int(np.searchsorted(old["time"], new["time"][0], side="left")) if len(new["time"]) else len(old["time"])
+    return {name: np.concatenate([old[name][:keep], new[name]])[-max_bars:] for name in COLUMNS}
+
+
+async def wait_snapshot(snapshot: Awaitable[dict], timeout: float = SNAPSHOT_TIMEOUT) -> dict:
+    """The snapshot, or {} when it fails or takes longer than ``timeout``."""
+
+    try:
+        return await asyncio.wait_for(snapshot, timeout)
+    except Exception as e:
+        logging.warning(f"[INDICATORS] Snapshot unavailable: {e!r}")
+        return {}
+
+
+class IndicatorService:
+    """Indicator snapshots for the /market prompt, cached per (trade type, symbol, interval).
+
+    The first lookup loads a full candle history. Once the TTL expires, only the bars
+    from the last cached one on are fetched and merged before recomputing, so a
+    refresh costs a few bars of upstream data however long the entry sat idle (and a
+    full reload once the gap is longer than the cached window). Streamed stocks also
+    get intraday indicators from the local 1m bars without any upstream call.
+    Concurrent misses for one key share a single fetch; entries are evicted least
+    recently used beyond ``max_entries``.
+    """
+
+    def __init__(
+            self,
+            http_client: HttpClient,
+            trade_bars: Optional[BarAggregator] = None,
+            max_bars: int = 500,
+            max_entries: int = 512
+    ):
+        self.http_client = http_client
+        self.trade_bars = trade_bars
+        self.max_bars = max_bars
+        self.max_entries = max_entries
+        self._entries: OrderedDict[IndicatorKey, tuple[float, Candles, dict]] = OrderedDict()
+        self._inflight: dict[IndicatorKey, asyncio.Task] = {}
+
+        self.hits = 0
+        self.full_loads = 0
+        self.incremental = 0
+        self.errors = 0
+        self.evictions = 0
+
+    @staticmethod
+    def interval_for(trade_type: str) -> str:
+        return "4h" if trade_type == TradeType.CRYPTO.value else "1d"
+
+    async def load(self, trade_type: str, symbol: str, since: Optional[int]) -> Optional[Candles]:
+        """Upstream candles from ``since`` (epoch seconds, inclusive) on, or a full history when it is None."""
+
+        if trade_type == TradeType.CRYPTO_FUTURES.value:
+            if since is None:
+                rows = await future_crypto_klines(self.http_client, symbol, "1d", limit=365)
+            else:
+                rows = await future_crypto_klines(self.http_client, symbol, "1d", limit=self.max_bars, start_time=since * 1000)
+            return candles_from_rows(rows, time_scale=1000) if rows else None
+
+        if trade_type == TradeType.CRYPTO.value:
+            crypto_id, currency = symbol.split("/")
+            rows = await get_crypto_ohlc(self.http_client, crypto_id, currency, days=30)
+            return candles_from_rows(rows, time_scale=1000) if rows else None
+
+        return await get_history(symbol, period="1y", interval="1d", start=since)
+
+    def tail_start(self, trade_type: str, interval: str, candles: Candles) -> Optional[int]:
+        """Timestamp to refresh from, or None when the entry needs a full reload."""
+
+        # CoinGecko has no tail query at this granularity, so crypto always reloads its 30 days
+        if trade_type == TradeType.CRYPTO.value or len(candles["time"]) < MIN_BARS:
+            return None
+        last = int(candles["time"][-1])
+        if time.time() - last > self.max_bars * INTERVAL_SECONDS[interval]:
+            return None
+        return last
+
+    def _get(self, key: IndicatorKey) -> Optional[tuple[float, Candles, dict]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key: IndicatorKey, entry: tuple[float, Candles, dict]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def snapshot(self, trade_type: str, symbol: str) -> dict:
+        """Indicators for the prompt: upstream candles, plus ``intraday_1m`` for streamed stocks."""
+
+        trade_type = trade_type.lower()
+        symbol = normalize_symbol(trade_type, symbol)
+        result = await self.upstream(trade_type, symbol)
+        if trade_type == TradeType.STOCK.value:
+            intraday = self.local(symbol)
+            if intraday:
+                result = {**result, "intraday_1m": intraday}
+        return result
+
+    async def upstream(self, trade_type: str, symbol: str) -> dict:
+        interval = self.interval_for(trade_type)
+        key = (trade_type, symbol, interval)
+        entry = self._get(key)
+        if entry is not None and time.monotonic() - entry[0] < INDICATOR_TTLS[interval]:
+            self.hits += 1
+            return entry[2]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._refresh(key, entry))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _refresh(self, key: IndicatorKey, entry: Optional[tuple[float, Candles, dict]]) -> dict:
+        trade_type, symbol, interval = key
+        since = self.tail_start(trade_type, interval, entry[1]) if entry is not None else None
+        try:
+            candles = await self.load(trade_type, symbol, since)
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"[INDICATORS] Could not load candles for {symbol}: {e}")
+            candles = None
+
+        if candles is None:
+            # Serve the previous snapshot rather than nothing when the refresh fails
+            return entry[2] if entry is not None else {}
+
+        if since is not None:
+            self.incremental += 1
+            candles = merge_candles(entry[1], candles, self.max_bars)
+        else:
+            self.full_loads += 1
+            candles = merge_candles(None, candles, self.max_bars)
+
+        indicators = compute_indicators(candles)
+        self._set(key, (time.monotonic(), candles, indicators))
+        return indicators
+
+    def local(self, symbol: str) -> dict:
+        if self.trade_bars is None:
+            return {}
+        key = (TradeType.STOCK.value, symbol, "1m-local")
+        entry = self._get(key)
+        if entry is not None and time.monotonic() - entry[0] < INDICATOR_TTLS["1m-local"]:
+            self.hits += 1
+            return entry[2]
+
+        rows = self.trade_bars.bars(symbol, 60)
+        if len(rows) < MIN_BARS:
+            return {}
+        indicators = compute_indicators(candles_from_rows(rows))
+        self._set(key, (time.monotonic(), {}, indicators))
+        return indicators
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "full_loads": self.full_loads,
+            "incremental": self.incremental,
+            "errors": self.errors,
+            "evictions": self.evictions,
+        }
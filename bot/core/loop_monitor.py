@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from typing import Optional
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag by timing how late a short sleep wakes up.
+
+    Any coroutine that blocks the loop (a sync HTTP call, heavy parsing) shows up
+    as a late wake-up, so ``max_lag`` is an upper bound on how long the loop was
+    stalled while the monitor ran.
+    """
+
+    def __init__(self, interval: float = 0.05, warn_threshold: float = 0.05):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self):
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.warn_threshold:
+                self.stalls += 1
+                logging.warning(f"[LOOP LAG] Event loop stalled for {lag * 1000:.1f}ms")
+
+    def stats(self) -> dict:
+        return {
+            "samples": self.samples,
+            "mean_lag_ms": round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "stalls": self.stalls,
+        }
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Optional
+
+from bot.api.crypto_api import get_crypto_price, get_crypto_prices
+from bot.api.future_crypto_api import future_crypto_api
+from bot.api.http_client import HttpClient
+from bot.api.index_futures_api import get_index_futures_batch, get_index_futures_data
+from bot.api.stock_api import get_stock_price
+from bot.core.constant import TradeType
+from bot.core.futures_snapshot import FuturesSnapshot
+from bot.core.quote_cache import QuoteCache, QuoteKey
+
+Provider = Callable[[str], Awaitable[dict]]
+BatchProvider = Callable[[list[str]], Awaitable[dict[str, dict]]]
+
+# Max in-flight upstream calls per provider, keyed by TradeType value
+PROVIDER_LIMITS = {
+    TradeType.STOCK.value: 10,
+    TradeType.CRYPTO.value: 5,
+    TradeType.CRYPTO_FUTURES.value: 10,
+    TradeType.FOREX.value: 5,
+    TradeType.INDICES_FUTURES.value: 5,
+}
+
+# Seconds a single symbol may take once it holds a provider slot
+SYMBOL_TIMEOUT = 8.0
+
+
+def normalize_symbol(trade_type: str, symbol: str) -> str:
+    """Map a user-typed symbol to the form its provider expects, e.g. ``eur/usd`` -> ``EURUSD=X``."""
+
+    trade_type = trade_type.lower()
+    symbol = symbol.strip()
+
+    if trade_type == TradeType.CRYPTO.value:
+        crypto_id, _, currency = symbol.partition("/")
+        return f"{crypto_id.lower()}/{(currency or 'usd').lower()}"
+    if trade_type == TradeType.FOREX.value:
+        if symbol.upper().endswith("=X"):
+            return symbol.upper()
+        asset, _, currency = symbol.partition("/")
+        return f"{asset}{currency}=X".upper()
+    if trade_type == TradeType.INDICES_FUTURES.value:
+        symbol = symbol.upper()
+        return symbol if symbol.endswith("=F") else f"{symbol}=F"
+    return symbol.upper()
+
+
+class MarketData:
+    """Fetches quotes for watchlist entries, one provider call per symbol, all at once.
+
+    Every entry is started immediately; a per-provider semaphore bounds how many
+    calls hit the same upstream and each call gets its own timeout, so a page
+    costs roughly one round trip of its slowest symbol. With a ``QuoteCache`` every
+    lookup goes through it first, keyed by (trade type, normalized symbol).
+
+    Trade types with a batch provider are fetched with one upstream call for all
+    their symbols on the page instead of one call per symbol. Crypto futures are
+    read from the ``FuturesSnapshot`` table and only fall back to REST for symbols
+    it cannot answer.
+    """
+
+    def __init__(
+            self,
+            http_client: Optional[HttpClient] = None,
+            providers: Optional[dict[str, Provider]] = None,
+            limits: Optional[dict[str, int]] = None,
+            timeout: float = SYMBOL_TIMEOUT,
+            cache: Optional[QuoteCache] = None,
+            batch_providers: Optional[dict[str, BatchProvider]] = None,
+            futures_snapshot: Optional[FuturesSnapshot] = None
+    ):
+        self.http_client = http_client
+        self.cache = cache
+        self.futures_snapshot = futures_snapshot
+        self.providers: dict[str, Provider] = providers or {
+            TradeType.STOCK.value: self._stock,
+            TradeType.CRYPTO.value: self._crypto,
+            TradeType.CRYPTO_FUTURES.value: self._crypto_futures,
+            TradeType.FOREX.value: self._forex,
+            TradeType.INDICES_FUTURES.value: self._indices_futures,
+        }
+        if batch_providers is None and providers is None:
+            batch_providers = {
+                TradeType.CRYPTO.value: self._crypto_batch,
+                TradeType.CRYPTO_FUTURES.value: self._crypto_futures_batch,
+                TradeType.FOREX.value: get_index_futures_batch,
+                TradeType.INDICES_FUTURES.value: get_index_futures_batch,
+            }
+        self.batch_providers: dict[str, BatchProvider] = batch_providers or {}
+        limits = limits or PROVIDER_LIMITS
+        self.semaphores = {trade_type: asyncio.Semaphore(limits.get(trade_type, 5)) for trade_type in self.providers}
+        self.timeout = timeout
+
+    # Providers receive symbols already passed through normalize_symbol
+    async def _stock(self, symbol: str) -> dict:
+        return await get_stock_price(self.http_client, symbol)
+
+    async def _crypto(self, symbol: str) -> dict:
+        crypto_id, currency = symbol.split("/")
+        return await get_crypto_price(self.http_client, crypto_id=crypto_id, currency=currency)
+
+    async def _crypto_batch(self, symbols: list[str]) -> dict[str, dict]:
+        by_currency = defaultdict(list)
+        for symbol in symbols:
+            crypto_id, currency = symbol.split("/")
+            by_currency[currency].append(crypto_id)
+
+        currencies = list(by_currency)
+        prices = await asyncio.gather(
+            *(get_crypto_prices(self.http_client, by_currency[currency], currency) for currency in currencies)
+        )
+        return {
+            f"{crypto_id}/{currency}": quote
+            for currency, currency_prices in zip(currencies, prices)
+            for crypto_id, quote in currency_prices.items()
+        }
+
+    async def _crypto_futures(self, symbol: str) -> dict:
+        if self.futures_snapshot is not None:
+            quote = self.futures_snapshot.get(symbol)
+            if quote is not None:
+                return quote
+        return await future_crypto_api(self.http_client, symbol)
+
+    async def _crypto_futures_batch(self, symbols: list[str]) -> dict[str, dict]:
+        quotes = await asyncio.gather(*(self._crypto_futures(symbol) for symbol in symbols))
+        return dict(zip(symbols, quotes))
+
+    async def _forex(self, symbol: str) -> dict:
+        return await get_index_futures_data(symbol=symbol)
+
+    async def _indices_futures(self, symbol: str) -> dict:
+        return await get_index_futures_data(symbol=symbol)
+
+    async def fetch_quote(self, trade_type: str, symbol: str) -> dict:
+        """Fetch one quote, always returning a dict (``{"error": ...}`` on failure)."""
+
+        trade_type = trade_type.lower()
+        if trade_type not in self.providers:
+            return {"error": f"Unsupported type {trade_type}"}
+
+        symbol = normalize_symbol(trade_type, symbol)
+        if self.cache is None:
+            return await self._fetch_upstream(trade_type, symbol)
+        return await self.cache.get_or_fetch(
+            (trade_type, symbol),
+            lambda: self._fetch_upstream(trade_type, symbol)
+        )
+
+    async def _fetch_upstream(self, trade_type: str, symbol: str) -> dict:
+        async with self.semaphores[trade_type]:
+            try:
+                return await asyncio.wait_for(self.providers[trade_type](symbol), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                logging.warning(f"[MARKET DATA] {trade_type} {symbol} timed out after {self.timeout}s")
+                return {"error": "Timed out"}
+            except Exception as e:
+                logging.error(f"[MARKET DATA] Error fetching {trade_type} {symbol}: {e}")
+                return {"error": f"Unexpected error: {str(e)}"}
+
+    async def fetch_batch(self, trade_type: str, symbols: list[str], refresh: bool = False) -> dict[QuoteKey, dict]:
+        """Fetch many symbols of one batch-capable type, keyed by (trade type, normalized symbol).
+
+        ``refresh`` skips cached quotes but still stores the fresh ones, for pollers whose
+        interval would otherwise line up with the cache TTL and be served every other poll.
+        """
+
+        trade_type = trade_type.lower()
+        keys = list(dict.fromkeys((trade_type, normalize_symbol(trade_type, symbol)) for symbol in symbols))
+        if self.cache is None:
+            return await self._fetch_upstream_many(trade_type, keys)
+        if refresh:
+            quotes = await self._fetch_upstream_many(trade_type, keys)
+            for key, quote in quotes.items():
+                if "error" not in quote:
+                    self.cache.set(key, quote)
+            return quotes
+        return await self.cache.get_or_fetch_many(
+            keys,
+            lambda missing: self._fetch_upstream_many(trade_type, missing)
+        )
+
+    async def _fetch_upstream_many(self, trade_type: str, keys: list[QuoteKey]) -> dict[QuoteKey, dict]:
+        symbols = [symbol for _, symbol in keys]
+        async with self.semaphores[trade_type]:
+            try:
+                quotes = await asyncio.wait_for(self.batch_providers[trade_type](symbols), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                logging.warning(f"[MARKET DATA] {trade_type} batch of {len(symbols)} timed out after {self.timeout}s")
+                quotes = {symbol: {"error": "Timed out"} for symbol in symbols}
+            except Exception as e:
+                logging.error(f"[MARKET DATA] Error fetching {trade_type} batch: {e}")
+                quotes = {symbol: {"error": f"Unexpected error: {str(e)}"} for symbol in symbols}
+
+        return {(trade_type, symbol): quotes.get(symbol, {"error": "Invalid symbol"}) for symbol in symbols}
+
+    async def fetch_quotes(self, entries: list[dict]) -> list[dict]:
+        """Fetch quotes for watchlist entries concurrently, returned in the same order as ``entries``."""
+
+        entries = [(entry["type"].lower(), entry["symbol"]) for entry in entries]
+
+        batched = defaultdict(list)
+        for trade_type, symbol in entries:
+            if trade_type in self.batch_providers:
+                batched[trade_type].append(symbol)
+
+        async def fetch_single(trade_type: str, symbol: str) -> Optional[dict]:
+            if trade_type in self.batch_providers:
+                return None
+            return await self.fetch_quote(trade_type, symbol)
+
+        batch_groups, singles = await asyncio.gather(
+            asyncio.gather(*(self.fetch_batch(trade_type, symbols) for trade_type, symbols in batched.items())),
+            asyncio.gather(*(fetch_single(trade_type, symbol) for trade_type, symbol in entries))
+        )
+
+        batch_quotes = {}
+        for group in batch_groups:
+            batch_quotes.update(group)
+
+        return [
+            quote if quote is not None else batch_quotes[(trade_type, normalize_symbol(trade_type, symbol))]
+            for (trade_type, symbol), quote in zip(entries, singles)
+        ]
@@ -0,0 +1,27 @@
+from collections import deque
+
+
+class LatencyStats:
+    """Rolling latency samples (seconds) summarised as count / p50 / p95 / max in milliseconds."""
+
+    def __init__(self, max_samples: int = 1000):
+        self.samples: deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(0.5) * 1000, 1),
+            "p95_ms": round(self.percentile(0.95) * 1000, 1),
+            "max_ms": round(max(self.samples, default=0.0) * 1000, 1),
+        }
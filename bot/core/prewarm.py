@@ -0,0 +1,137 @@
+import logging
+import time
+from collections import Counter
+from typing import Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from bot.core.ai import insight_cache, refresh_market_insight
+from bot.core.indicators import IndicatorService, wait_snapshot
+from bot.core.market_data import MarketData, normalize_symbol
+
+Pair = tuple[str, str]  # (TradeType value, normalized symbol)
+
+
+class PrewarmService:
+    """Keeps quotes and AI insights warm for the most popular (trade type, symbol) pairs.
+
+    Popularity mixes decayed /market request counts with how many watchlists hold
+    the pair. Every ``interval`` seconds the top ``top_n`` pairs are re-quoted in one
+    batched fan-out and up to ``ai_budget`` of them that /market actually asked for
+    and that lack a fresh insight get a background-priority completion, so the AI
+    scheduler still serves users first.
+    """
+
+    def __init__(
+            self,
+            user_collection: AsyncIOMotorCollection,
+            market_data: MarketData,
+            indicators: Optional[IndicatorService] = None,
+            interval: int = 60,
+            top_n: int = 25,
+            ai_budget: int = 5,
+            watch_weight: float = 0.5,
+            decay: float = 0.9
+    ):
+        self.user_collection = user_collection
+        self.market_data = market_data
+        self.indicators = indicators
+        self.interval = interval
+        self.top_n = top_n
+        self.ai_budget = ai_budget
+        self.watch_weight = watch_weight
+        self.decay = decay
+
+        self.request_counts: Counter[Pair] = Counter()
+        self.watch_counts: Counter[Pair] = Counter()
+        self.warm_pairs: set[Pair] = set()
+
+        self.requests = 0
+        self.covered_requests = 0
+        self.runs = 0
+        self.ai_generated = 0
+        self.last_run_ms = 0.0
+
+    def start(self, scheduler: AsyncIOScheduler):
+        scheduler.add_job(
+            self.run,
+            "interval",
+            seconds=self.interval,
+            id="prewarm_popular_symbols",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+    def record_request(self, trade_type: str, symbol: str):
+        pair = (trade_type.lower(), normalize_symbol(trade_type, symbol))
+        self.request_counts[pair] += 1
+        self.requests += 1
+        if pair in self.warm_pairs:
+            self.covered_requests += 1
+
+    async def refresh_watch_counts(self):
+        pipeline = [
+            {"$unwind": "$watchlist"},
+            {"$group": {"_id": {"symbol": "$watchlist.symbol", "type": "$watchlist.type"}, "watchers": {"$sum": 1}}},
+            {"$sort": {"watchers": -1}},
+            {"$limit": self.top_n * 10},
+        ]
+        watch_counts = Counter()
+        async for doc in self.user_collection.aggregate(pipeline):
+            trade_type = doc["_id"]["type"].lower()
+            watch_counts[(trade_type, normalize_symbol(trade_type, doc["_id"]["symbol"]))] += doc["watchers"]
+        self.watch_counts = watch_counts
+
+    def top_pairs(self) -> list[Pair]:
+        scores = Counter(self.request_counts)
+        for pair, watchers in self.watch_counts.items():
+            scores[pair] += watchers * self.watch_weight
+        return [pair for pair, _ in scores.most_common(self.top_n)]
+
+    async def run(self):
+        started = time.perf_counter()
+        try:
+            await self.refresh_watch_counts()
+        except Exception as e:
+            logging.error(f"[PREWARM] Could not load watchlist counts: {e}")
+
+        pairs = self.top_pairs()
+        quotes = await self.market_data.fetch_quotes([{"type": trade_type, "symbol": symbol} for trade_type, symbol in pairs])
+
+        budget = self.ai_budget
+        for pair, quote in zip(pairs, quotes):
+            if budget <= 0:
+                break
+            # Insights are only read by /market, so watch-only pairs get their quotes warmed but no completion
+            if self.request_counts[pair] <= 0 or "error" in quote or insight_cache.is_fresh(quote):
+                continue
+            budget -= 1
+            if self.indicators is not None:
+                # Same prompt data as /market, so the warmed insight is the one it would generate
+                indicators = await wait_snapshot(self.indicators.snapshot(*pair))
+                if indicators:
+                    quote = {**quote, "indicators": indicators}
+            if await refresh_market_insight(quote):
+                self.ai_generated += 1
+
+        self.warm_pairs = set(pairs)
+        for pair in list(self.request_counts):
+            self.request_counts[pair] *= self.decay
+            if self.request_counts[pair] < 0.1:
+                del self.request_counts[pair]
+
+        self.runs += 1
+        self.last_run_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def stats(self) -> dict:
+        return {
+            "warm_pairs": len(self.warm_pairs),
+            "requests": self.requests,
+            "covered": self.covered_requests,
+            "coverage": round(self.covered_requests / self.requests, 3) if self.requests else 0.0,
+            "runs": self.runs,
+            "ai_generated": self.ai_generated,
+            "last_run_ms": self.last_run_ms,
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Optional
+
+from bot.core.constant import TradeType
+
+QuoteKey = tuple[str, str]  # (TradeType value, normalized symbol)
+
+# Seconds a quote stays fresh, per asset class
+QUOTE_TTLS = {
+    TradeType.STOCK.value: 5,
+    TradeType.CRYPTO.value: 30,
+    TradeType.CRYPTO_FUTURES.value: 3,
+    TradeType.FOREX.value: 15,
+    TradeType.INDICES_FUTURES.value: 15,
+}
+
+
+class QuoteCache:
+    """LRU + TTL cache for quotes with singleflight request coalescing.
+
+    Concurrent misses for the same key await one shared upstream task instead of
+    each calling the provider. Error results are handed to every waiter but never
+    stored, so a failed lookup is retried on the next call.
+    """
+
+    def __init__(self, ttls: Optional[dict[str, float]] = None, max_size: int = 2048, default_ttl: float = 10):
+        self.ttls = ttls or QUOTE_TTLS
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[QuoteKey, tuple[float, dict]] = OrderedDict()
+        self._inflight: dict[QuoteKey, asyncio.Task] = {}
+        self.counters: dict[str, dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0})
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: QuoteKey) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: QuoteKey, value: dict):
+        ttl = self.ttls.get(key[0], self.default_ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(self, key: QuoteKey, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        counters = self.counters[key[0]]
+
+        cached = self.get(key)
+        if cached is not None:
+            counters["hits"] += 1
+            return dict(cached)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            counters["coalesced"] += 1
+        else:
+            counters["misses"] += 1
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._on_fetched(key, done))
+
+        # Shielded so one caller giving up does not cancel the fetch the others wait on
+        return dict(await asyncio.shield(task))
+
+    async def get_or_fetch_many(
+            self,
+            keys: list[QuoteKey],
+            fetch_many: Callable[[list[QuoteKey]], Awaitable[dict[QuoteKey, dict]]]
+    ) -> dict[QuoteKey, dict]:
+        """Batch variant of ``get_or_fetch``: every key that is neither cached nor in flight
+        is fetched with a single ``fetch_many`` call, which the other waiters then share."""
+
+        results: dict[QuoteKey, dict] = {}
+        waiting: dict[QuoteKey, asyncio.Task] = {}
+        missing: list[QuoteKey] = []
+
+        for key in dict.fromkeys(keys):
+            counters = self.counters[key[0]]
+            cached = self.get(key)
+            if cached is not None:
+                counters["hits"] += 1
+                results[key] = dict(cached)
+            elif key in self._inflight:
+                counters["coalesced"] += 1
+                waiting[key] = self._inflight[key]
+            else:
+                counters["misses"] += 1
+                missing.append(key)
+
+        if missing:
+            batch = asyncio.create_task(fetch_many(missing))
+            for key in missing:
+                task = asyncio.create_task(self._pick(batch, key))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done, key=key: self._on_fetched(key, done))
+                waiting[key] = task
+
+        for key, task in waiting.items():
+            results[key] = dict(await asyncio.shield(task))
+        return results
+
+    @staticmethod
+    async def _pick(batch: asyncio.Task, key: QuoteKey) -> dict:
+        return (await asyncio.shield(batch)).get(key, {"error": "Invalid symbol"})
+
+    def _on_fetched(self, key: QuoteKey, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        value = task.result()
+        if "error" not in value:
+            self.set(key, value)
+
+    def stats(self) -> dict:
+        totals = {"hits": 0, "misses": 0, "coalesced": 0}
+        for counters in self.counters.values():
+            for name, count in counters.items():
+                totals[name] += count
+
+        lookups = sum(totals.values())
+        return {
+            **totals,
+            "hit_rate": round(totals["hits"] / lookups, 3) if lookups else 0.0,
+            "size": len(self._entries),
+            "evictions": self.evictions,
+            "by_type": {trade_type: dict(counters) for trade_type, counters in self.counters.items()},
+        }